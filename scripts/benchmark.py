@@ -0,0 +1,259 @@
+"""
+Benchmark preprocessing and the koza transforms on synthetic catalogs.
+
+Each stage runs in a fresh process against a synthetic catalog (see ``synthetic_catalog.py``) at
+every requested scale, and its wall time, throughput in rows per second and peak resident set
+size are recorded. Preprocessing throughput is measured in catalog rows read, transform throughput
+in KGX rows written. Results are compared against a stored baseline, and any stage that got slower
+or larger than the baseline by more than the tolerance is reported as a regression.
+
+With ``--startup`` it instead checks startup cost against fixed budgets, each in a fresh
+interpreter: the time to import the modules the pipeline's parent process uses, which must not
+pull in koza or the Biolink model, and the time for each transform to write its first record.
+"""
+
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pipeline import INGEST_DIR, PRELOAD_MODULES, TRANSFORMS, run_transform
+from preprocess import preprocess_mmrrc
+from synthetic_catalog import synthetic_catalog
+from telemetry import peak_memory_bytes
+
+STAGES = ("preprocess", *TRANSFORMS)
+DEFAULT_BASELINE = INGEST_DIR / "benchmarks" / "baseline.json"
+DEFAULT_TOLERANCE = 0.2
+
+# Modules imported outside the transform workers; none of them may load koza or the Biolink model
+LIGHT_MODULES = ("pipeline", "preprocess", "export_kgx", "validate", "catalog_store", "transform_delta")
+HEAVY_MODULES = ("koza", "biolink_model")
+
+# Startup budgets in seconds, measured in a fresh interpreter
+IMPORT_BUDGET_SECONDS = 2.0
+FIRST_RECORD_BUDGET_SECONDS = 20.0
+
+# Imports the modules named on the command line and prints the time taken and the heavy modules loaded
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for module in sys.argv[2:]:
+    __import__(module)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "heavy": sorted(m for m in sys.argv[1].split(",") if m in sys.modules)}))
+"""
+
+# Runs one transform over a single input row and prints the time from interpreter start-up
+FIRST_RECORD_PROBE = """
+import json, sys, time
+from pathlib import Path
+start = time.perf_counter()
+from pipeline import run_transform
+run_transform(sys.argv[1], Path(sys.argv[2]), Path(sys.argv[3]), check_counts=False, row_limit=1)
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def measure_stage(stage: str, catalog: Path, work_dir: Path) -> dict[str, float | int | None]:
+    """Run ``stage`` in this process and return its rows, wall time, rows per second and peak RSS."""
+    if stage != "preprocess":
+        # Import koza and the model up front, as the pipeline's fork server does, so only the transform is timed
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+    start = time.perf_counter()
+    if stage == "preprocess":
+        rows = preprocess_mmrrc(catalog, work_dir / "processed")["mmrrc"]
+    else:
+        counts = run_transform(stage, work_dir / "output", work_dir / "processed", check_counts=False)
+        rows = sum(counts.values())
+    wall_seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "wall_seconds": round(wall_seconds, 3),
+        "rows_per_second": round(rows / wall_seconds, 1) if wall_seconds else None,
+        "peak_rss_bytes": peak_memory_bytes(),
+    }
+
+
+def run_stage(stage: str, catalog: Path, work_dir: Path) -> dict[str, float | int | None]:
+    """Run ``stage`` in a new process, so its peak RSS isn't inflated by earlier stages."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(measure_stage, stage, catalog, work_dir).result()
+
+
+def run_benchmarks(
+    scales: tuple[float, ...] = (1,),
+    stages: tuple[str, ...] = STAGES,
+    work_dir: Path = INGEST_DIR / "data" / "benchmark",
+    seed: int = 0,
+) -> dict[str, dict[str, dict[str, float | int | None]]]:
+    """
+    Benchmark ``stages`` on a synthetic catalog at each of ``scales``.
+
+    The transforms read the preprocess output for their scale, so ``"preprocess"`` should be
+    listed first unless that output already exists in ``work_dir``.
+
+    Returns:
+        dict: Measurements per stage, per scale label such as ``"10x"``
+
+    """
+    results = {}
+    for scale in scales:
+        label = f"{scale:g}x"
+        catalog = synthetic_catalog(scale, seed, data_dir=work_dir)
+        results[label] = {}
+        for stage in stages:
+            print(f"Benchmarking {stage} at {label}...")
+            results[label][stage] = run_stage(stage, catalog, work_dir / label)
+    return results
+
+
+def run_probe(probe: str, *args: str) -> dict:
+    """Run ``probe`` in a fresh interpreter with the scripts and ``src`` importable, and return its JSON output."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(INGEST_DIR / "scripts"), str(INGEST_DIR)])}
+    result = subprocess.run(
+        [sys.executable, "-c", probe, *args], cwd=INGEST_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(
+    processed_dir: Path, output_dir: Path, transforms: tuple[str, ...] = TRANSFORMS
+) -> dict[str, float | list[str] | dict[str, float]]:
+    """
+    Measure startup cost, each part in a fresh interpreter.
+
+    Args:
+        processed_dir: Processed CSVs for the transforms to read their first row from
+        output_dir: Directory for the transforms' KGX files
+        transforms: Transforms to measure the first-record latency of
+
+    Returns:
+        dict: ``import_seconds`` for ``LIGHT_MODULES``, the ``heavy_modules`` they loaded, and
+        ``first_record_seconds`` per transform
+
+    """
+    imports = run_probe(IMPORT_PROBE, ",".join(HEAVY_MODULES), *LIGHT_MODULES)
+    return {
+        "import_seconds": round(imports["seconds"], 3),
+        "heavy_modules": imports["heavy"],
+        "first_record_seconds": {
+            name: round(run_probe(FIRST_RECORD_PROBE, name, str(output_dir), str(processed_dir))["seconds"], 3)
+            for name in transforms
+        },
+    }
+
+
+def check_startup(startup: dict) -> list[str]:
+    """Return a description of each way ``startup`` exceeds the startup budgets."""
+    problems = []
+    if startup["heavy_modules"]:
+        problems.append(f"importing {', '.join(LIGHT_MODULES)} loaded {', '.join(startup['heavy_modules'])}")
+    if startup["import_seconds"] > IMPORT_BUDGET_SECONDS:
+        problems.append(f"imports took {startup['import_seconds']:.2f}s, budget {IMPORT_BUDGET_SECONDS:.2f}s")
+    for name, seconds in startup["first_record_seconds"].items():
+        if seconds > FIRST_RECORD_BUDGET_SECONDS:
+            problems.append(f"{name} first record took {seconds:.2f}s, budget {FIRST_RECORD_BUDGET_SECONDS:.2f}s")
+    return problems
+
+
+def find_regressions(
+    results: dict[str, dict[str, dict]], baseline: dict[str, dict[str, dict]], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Compare ``results`` against ``baseline``.
+
+    Returns:
+        list[str]: A description of each stage whose throughput fell, or whose peak RSS grew, by more than
+        ``tolerance`` (a fraction of the baseline value). Stages missing from the baseline are not compared.
+
+    """
+    regressions = []
+    for label, stages in results.items():
+        for stage, result in stages.items():
+            expected = baseline.get(label, {}).get(stage)
+            if expected is None:
+                continue
+            if result["rows_per_second"] and expected.get("rows_per_second"):
+                if result["rows_per_second"] < expected["rows_per_second"] * (1 - tolerance):
+                    regressions.append(
+                        f"{stage} at {label}: {result['rows_per_second']:,.0f} rows/s, "
+                        f"baseline {expected['rows_per_second']:,.0f} rows/s"
+                    )
+            if result["peak_rss_bytes"] and expected.get("peak_rss_bytes"):
+                if result["peak_rss_bytes"] > expected["peak_rss_bytes"] * (1 + tolerance):
+                    regressions.append(
+                        f"{stage} at {label}: peak RSS {result['peak_rss_bytes'] / 2**20:.1f} MiB, "
+                        f"baseline {expected['peak_rss_bytes'] / 2**20:.1f} MiB"
+                    )
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark preprocess and the transforms on synthetic catalogs.")
+    parser.add_argument(
+        "--scale", dest="scales", type=float, action="append", help="Catalog size relative to today's (default: 1)"
+    )
+    parser.add_argument("--stage", dest="stages", action="append", choices=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", type=Path, default=INGEST_DIR / "data" / "benchmark")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (default: 0.2)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--startup", action="store_true", help="Check import time and first-record latency instead")
+    args = parser.parse_args()
+
+    if args.startup:
+        catalog = synthetic_catalog(1, args.seed, data_dir=args.work_dir)
+        processed_dir = args.work_dir / "startup" / "processed"
+        if not processed_dir.exists():
+            preprocess_mmrrc(catalog, processed_dir)
+        transforms = tuple(stage for stage in args.stages or TRANSFORMS if stage in TRANSFORMS)
+        startup = measure_startup(processed_dir, args.work_dir / "startup" / "output", transforms)
+        print(f"\nImporting {', '.join(LIGHT_MODULES)}: {startup['import_seconds']:.2f}s")
+        for name, seconds in startup["first_record_seconds"].items():
+            print(f"  {name} first record: {seconds:.2f}s")
+        problems = check_startup(startup)
+        for problem in problems:
+            print(f"Over budget: {problem}", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+    results = run_benchmarks(
+        tuple(args.scales or (1,)), tuple(args.stages or STAGES), work_dir=args.work_dir, seed=args.seed
+    )
+
+    print("\nBenchmark results:")
+    for label, stages in results.items():
+        for stage, result in stages.items():
+            peak = f"{result['peak_rss_bytes'] / 2**20:.1f} MiB" if result["peak_rss_bytes"] else "n/a"
+            print(
+                f"  {label} {stage}: {result['rows']} rows in {result['wall_seconds']:.2f}s "
+                f"({result['rows_per_second']:,.0f} rows/s), peak RSS {peak}"
+            )
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"platform": platform.platform(), "results": results}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("platform") != platform.platform():
+            print(f"\nNote: baseline was recorded on {baseline.get('platform')}, not this platform")
+        regressions = find_regressions(results, baseline["results"], args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to store one")
@@ -0,0 +1,201 @@
+"""
+Compact, columnar archive of the normalized tables of every MMRRC catalog release.
+
+``preprocess.py --archive-dir`` appends each release's normalized tables to the archive as
+zstd-compressed, dictionary-encoded Parquet, in one partition per release and table:
+``<archive_dir>/<table>/release=<version>/data.parquet``. A partition holds only the rows that
+were added in that release, and the rows that were removed since the previous release, each with
+a ``change`` column. Unchanged rows are never stored twice, so the archive grows with the churn
+between releases rather than with the size of the catalog. A changed row is stored as the old row
+removed and the new one added.
+
+Releases have to be archived oldest first. Their versions have to be ISO dates (``YYYY-MM-DD``), as
+``get_source_versions`` reports them, so that they sort in release order. Archiving the latest
+release again replaces it.
+
+``history`` answers questions like when a strain gained a phenotype annotation by reading only the
+matching rows of each partition. The partitions are sorted on ``strain_id``, so the Parquet row
+group statistics skip the rest.
+"""
+
+import shutil
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(INGEST_DIR))
+
+ARCHIVE_DIR = INGEST_DIR / "data" / "archive"
+PARTITION_FILE = "data.parquet"
+
+# History name -> (table, column) pairs whose rows are looked up by the ID
+HISTORIES = {
+    "strain": (
+        ("genotypes", "strain_id"),
+        ("allele_to_genotype", "strain_id"),
+        ("genotype_to_phenotype", "strain_id"),
+    ),
+    "allele": (("allele_to_genotype", "allele_id"),),
+    "phenotype": (("genotype_to_phenotype", "phenotype_id"),),
+}
+
+
+def source_version() -> str:
+    """
+    Return the version of the downloaded catalog, as recorded in the release metadata.
+
+    Raises:
+        ValueError: If the catalog has no known version
+
+    """
+    # Imported here: it needs kozahub-metadata-schema, which archiving with an explicit release doesn't
+    from src.versions import get_source_versions
+
+    version = get_source_versions()[0]["version"]
+    if version == "unknown":
+        raise ValueError("The catalog version is unknown; give the release version explicitly")
+    return version
+
+
+def check_release(release: str) -> None:
+    """
+    Check that ``release`` is an ISO date, so that comparing versions as text orders them by date.
+
+    Raises:
+        ValueError: If ``release`` isn't a ``YYYY-MM-DD`` date
+
+    """
+    try:
+        valid = date.fromisoformat(release).isoformat() == release
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f"Release {release!r} isn't an ISO date (YYYY-MM-DD)")
+
+
+def releases(archive_dir: Path) -> list[str]:
+    """Return the versions archived in ``archive_dir``, oldest first."""
+    return sorted({partition.name.removeprefix("release=") for partition in archive_dir.glob("*/release=*")})
+
+
+def partition_files(archive_dir: Path, table: str, before: str | None = None) -> list[str]:
+    """Return the partition files of ``table``, only those of releases before ``before`` if given."""
+    files = sorted((archive_dir / table).glob(f"release=*/{PARTITION_FILE}"))
+    return [str(file) for file in files if before is None or file.parent.name.removeprefix("release=") < before]
+
+
+def read_partitions(files: list[str]) -> str:
+    """Return a ``read_parquet`` call over ``files``, with the ``release`` column taken from the path as text."""
+    return f"read_parquet({files}, hive_partitioning=true, hive_types_autocast=false, union_by_name=true)"
+
+
+def archive_release(
+    con: duckdb.DuckDBPyConnection, tables: dict[str, tuple[str, ...]], archive_dir: Path, release: str
+) -> dict[str, int]:
+    """
+    Append the rows of ``tables`` added and removed since the previous archived release to ``archive_dir``.
+
+    Args:
+        con: Connection holding the tables
+        tables: Table name -> columns to sort its partitions on
+        archive_dir: The archive directory
+        release: The release version the tables are from
+
+    Returns:
+        dict[str, int]: Rows archived per ``<change>/<table>``
+
+    Raises:
+        ValueError: If ``release`` isn't an ISO date, or a newer release is already archived
+
+    """
+    check_release(release)
+    archived = releases(archive_dir)
+    if archived and release < archived[-1]:
+        raise ValueError(f"Release {release} is older than the latest archived release {archived[-1]}")
+
+    counts = {}
+    for table, keys in tables.items():
+        previous = f"archived_{table}"
+        described = con.execute(f"DESCRIBE {table}").fetchall()
+        columns = ", ".join(f'"{name}"' for name, *_ in described)
+        files = partition_files(archive_dir, table, before=release)
+        if files:
+            # The previous release is every row whose latest change is an addition. Cast to the current
+            # column types, so partitions from before a type change still compare.
+            typed = ", ".join(f'TRY_CAST("{name}" AS {column_type}) AS "{name}"' for name, column_type, *_ in described)
+            con.execute(f"""
+                CREATE TEMP TABLE {previous} AS
+                SELECT {columns} FROM (SELECT {typed}, release, change FROM {read_partitions(files)})
+                QUALIFY row_number() OVER (PARTITION BY {columns} ORDER BY release DESC) = 1 AND change = 'added'
+            """)  # noqa: S608
+        else:
+            con.execute(f"CREATE TEMP TABLE {previous} AS SELECT {columns} FROM {table} LIMIT 0")  # noqa: S608
+
+        # Write under a temporary name so a half-written partition is never read
+        partition = archive_dir / table / f"release={release}"
+        partial = partition.with_name(f".{partition.name}.partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+        con.execute(f"""
+            COPY (
+                SELECT *, 'added' AS change FROM (SELECT {columns} FROM {table} EXCEPT SELECT * FROM {previous})
+                UNION ALL
+                SELECT *, 'removed' AS change FROM (SELECT * FROM {previous} EXCEPT SELECT {columns} FROM {table})
+                ORDER BY {", ".join(keys)}, change
+            ) TO '{partial / PARTITION_FILE}' (FORMAT PARQUET, COMPRESSION zstd)
+        """)  # noqa: S608
+        shutil.rmtree(partition, ignore_errors=True)
+        partial.rename(partition)
+        con.execute(f"DROP TABLE {previous}")
+
+        for change in ("added", "removed"):
+            query = f"SELECT COUNT(*) FROM read_parquet('{partition / PARTITION_FILE}') WHERE change = ?"  # noqa: S608
+            counts[f"{change}/{table}"] = con.execute(query, [change]).fetchone()[0]
+    return counts
+
+
+def history(archive_dir: Path, name: str, value: str) -> list[dict[str, Any]]:
+    """
+    Return every archived change to the rows of the ``HISTORIES`` entry ``name`` for ``value``, oldest first.
+
+    Each change is a dict of the ``release``, the ``table``, the ``change`` (``added`` or ``removed``)
+    and the row's columns.
+    """
+    con = duckdb.connect(":memory:")
+    changes = []
+    try:
+        for table, column in HISTORIES[name]:
+            files = partition_files(archive_dir, table)
+            if not files:
+                continue
+            result = con.execute(
+                f"""
+                SELECT release, change, * EXCLUDE (release, change)
+                FROM {read_partitions(files)}
+                WHERE {column} = ?
+                """,  # noqa: S608
+                [value],
+            )
+            columns = [column[0] for column in result.description]
+            changes.extend({"table": table, **dict(zip(columns, row))} for row in result.fetchall())
+    finally:
+        con.close()
+    # Within a release, a changed row's removal comes before its replacement
+    return sorted(changes, key=lambda change: (change["release"], change["change"] != "removed"))
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Show the history of a strain, allele or phenotype across releases.")
+    parser.add_argument("history", choices=HISTORIES)
+    parser.add_argument("value", help="Strain, allele or phenotype ID, e.g. MMRRC:000001-UNC")
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    print(json.dumps(history(args.archive_dir, args.history, args.value), indent=2, default=str))
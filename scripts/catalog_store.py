@@ -0,0 +1,90 @@
+"""
+Persistent, indexed DuckDB store of the normalized MMRRC catalog.
+
+``preprocess.py --store`` writes the loaded catalog (``mmrrc``) and the three normalized tables to a
+single ``.duckdb`` file next to the processed CSVs. Each table is stored sorted on its keys, so one
+strain's rows are contiguous and DuckDB's zone maps skip the rest, and has ART indexes on
+``strain_id``, ``allele_id`` and ``phenotype_id``, so point lookups take milliseconds however large
+the catalog grows. With ``pipeline.py --store`` the koza transforms read their rows from the store
+instead of parsing the processed CSVs (see ``src/store_rows.py``).
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+STORE_FILE = "mmrrc.duckdb"
+
+# Table -> columns with an index for point lookups
+STORE_INDEXES = {
+    "mmrrc": ('"STRAIN/STOCK_ID"', "MGI_ALLELE_ACCESSION_ID"),
+    "genotypes": ("strain_id",),
+    "allele_to_genotype": ("strain_id", "allele_id"),
+    "genotype_to_phenotype": ("strain_id", "phenotype_id"),
+}
+
+# Lookup name -> query taking the looked-up ID as its only parameter
+LOOKUPS = {
+    "strain": "SELECT * FROM genotypes WHERE strain_id = ?",
+    "strain_phenotypes": (
+        "SELECT phenotype_id, phenotype_label FROM genotype_to_phenotype WHERE strain_id = ? ORDER BY phenotype_id"
+    ),
+    "strain_alleles": (
+        "SELECT allele_id, allele_symbol, allele_name FROM allele_to_genotype WHERE strain_id = ? ORDER BY allele_id"
+    ),
+    "allele_strains": "SELECT strain_id FROM allele_to_genotype WHERE allele_id = ? ORDER BY strain_id",
+    "phenotype_strains": "SELECT strain_id FROM genotype_to_phenotype WHERE phenotype_id = ? ORDER BY strain_id",
+}
+
+
+def write_store(con: duckdb.DuckDBPyConnection, tables: dict[str, tuple[str, ...]], store_file: Path) -> None:
+    """
+    Copy ``tables`` from ``con`` into a new DuckDB file at ``store_file``, replacing any previous one.
+
+    Args:
+        con: Connection holding the tables
+        tables: Table name -> columns to sort it on
+        store_file: The ``.duckdb`` file to write
+
+    """
+    # Build under a temporary name so a half-written store is never read
+    partial_file = store_file.with_name(f"{store_file.name}.partial")
+    partial_file.unlink(missing_ok=True)
+    con.execute(f"ATTACH '{partial_file}' AS store")
+    for table, keys in tables.items():
+        con.execute(f"CREATE TABLE store.{table} AS SELECT * FROM {table} ORDER BY {', '.join(keys)}")  # noqa: S608
+        for column in STORE_INDEXES.get(table, ()):
+            index = "_".join([table, column.strip('"').replace("/", "_").lower(), "idx"])
+            con.execute(f"CREATE INDEX {index} ON store.{table} ({column})")
+    con.execute("DETACH store")
+    os.replace(partial_file, store_file)
+
+
+def connect(store_file: Path) -> duckdb.DuckDBPyConnection:
+    """Open ``store_file`` read-only, so any number of processes can read it at once."""
+    return duckdb.connect(str(store_file), read_only=True)
+
+
+def lookup(con: duckdb.DuckDBPyConnection, name: str, value: str) -> list[dict[str, Any]]:
+    """Run the ``LOOKUPS`` query ``name`` for ``value`` and return the rows as dicts."""
+    result = con.execute(LOOKUPS[name], [value])
+    columns = [column[0] for column in result.description]
+    return [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Look up strains, alleles and phenotypes in the catalog store.")
+    parser.add_argument("lookup", choices=LOOKUPS)
+    parser.add_argument("value", help="Strain, allele or phenotype ID, e.g. MMRRC:000001-UNC")
+    parser.add_argument("--store", type=Path, default=INGEST_DIR / "data" / "processed" / STORE_FILE)
+    args = parser.parse_args()
+
+    con = connect(args.store)
+    print(json.dumps(lookup(con, args.lookup, args.value), indent=2, default=str))
+    con.close()
@@ -0,0 +1,58 @@
+"""
+Download the sources listed in download.yaml, skipping any that haven't changed upstream.
+
+Each source is fetched with a conditional GET against the ETag/Last-Modified of the previous
+download (see ``src/download_cache.py``), so an unchanged catalog costs one ``304`` response rather
+than a full transfer. Compressed copies and cache entries are kept in ``data/cache``.
+"""
+
+import sys
+from pathlib import Path
+
+import yaml
+
+from telemetry import TELEMETRY_FILE, record_stage
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(INGEST_DIR))
+
+from src.download_cache import fetch  # noqa: E402
+
+CACHE_DIR = INGEST_DIR / "data" / "cache"
+
+
+def download_sources(
+    download_yaml: Path = INGEST_DIR / "download.yaml",
+    cache_dir: Path = CACHE_DIR,
+    telemetry_file: Path | None = None,
+) -> list[dict]:
+    """
+    Fetch every source in ``download_yaml`` to its ``local_name``, relative to the ingest directory.
+
+    Returns:
+        list[dict]: The cache entry of each source, with ``changed`` set if new content was downloaded
+
+    """
+    with download_yaml.open() as fh:
+        sources = yaml.safe_load(fh)
+
+    entries = []
+    for source in sources:
+        local_file = INGEST_DIR / source["local_name"]
+        with record_stage("download", telemetry_file, [local_file]) as stats:
+            entry = fetch(source["url"], local_file, cache_dir)
+            stats["changed"] = entry["changed"]
+        print(f"  {source['local_name']}: {'downloaded' if entry['changed'] else 'unchanged upstream'}")
+        entries.append(entry)
+    return entries
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Download the MMRRC sources, skipping unchanged ones.")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    parser.add_argument("--telemetry-file", type=Path, default=TELEMETRY_FILE)
+    args = parser.parse_args()
+
+    download_sources(cache_dir=args.cache_dir, telemetry_file=args.telemetry_file)
@@ -0,0 +1,175 @@
+"""
+Export the MMRRC KGX node and edge files straight from DuckDB, without the processed CSVs or koza.
+
+Each transform is expressed as a SQL projection over the normalized preprocess query it would
+otherwise read from ``data/processed``. Columns are those listed in the transform YAML's
+``node_properties``/``edge_properties``, in the order koza's TSV writer uses, and values are
+sanitized the way koza sanitizes them, so the files match what the koza transforms write. The
+Python ``transform_record`` functions remain the reference; tests/test_export_kgx.py compares
+the two paths.
+"""
+
+import sys
+from pathlib import Path
+
+import duckdb
+import yaml
+
+from preprocess import OUTPUTS, TABLE_KEYS, CatalogRejectsError, check_rejects, load_catalog, parse_mpt_ids
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(INGEST_DIR))
+
+from src.edge_ids import EDGE_ID_MACRO  # noqa: E402
+
+# csv_value: a processed CSV field as koza's CSV reader yields it, i.e. stripped of surrounding
+# whitespace (the characters Python's str.strip() removes from ASCII and Latin-1 text).
+# kgx_value: a value as koza's TSV writer writes it, with newlines, tabs and escaped quotes
+# replaced the way koza.io.utils.build_export_row does.
+KGX_VALUE_MACROS = r"""
+    CREATE OR REPLACE MACRO csv_value(v) AS
+        trim(coalesce(v, ''), ' ' || chr(9) || chr(10) || chr(11) || chr(12) || chr(13) || chr(28) || chr(29)
+            || chr(30) || chr(31) || chr(133) || chr(160));
+    CREATE OR REPLACE MACRO kgx_value(v) AS
+        replace(replace(replace(csv_value(v), chr(10), ' '), '\"', ''), chr(9), ' ');
+"""
+
+# Transform config name -> (normalized table read, row filter, column -> SQL expression).
+# These mirror transform_record in src/genotypes.py, src/genotype_to_phenotype.py and
+# src/allele_to_genotype.py.
+EXPORTS = {
+    "genotype": (
+        "genotypes",
+        "csv_value(strain_id) != ''",
+        {
+            "id": "csv_value(strain_id)",
+            "category": "'biolink:Genotype'",
+            "name": "kgx_value(strain_designation)",
+            "xref": "kgx_value(other_names)",
+            "in_taxon": "'NCBITaxon:10090'",
+            "in_taxon_label": "'Mus musculus'",
+            "provided_by": "'infores:mmrrc'",
+        },
+    ),
+    "genotype_to_phenotype": (
+        "genotype_to_phenotype",
+        "csv_value(strain_id) != '' AND csv_value(phenotype_id) != '' AND csv_value(phenotype_label) != ''",
+        {
+            "id": "edge_id(csv_value(strain_id), 'biolink:has_phenotype', csv_value(phenotype_id), 'infores:mmrrc')",
+            "subject": "kgx_value(strain_id)",
+            "predicate": "'biolink:has_phenotype'",
+            "object": "kgx_value(phenotype_id)",
+            "category": "'biolink:GenotypeToPhenotypicFeatureAssociation'",
+            "knowledge_level": "'knowledge_assertion'",
+            "agent_type": "'manual_agent'",
+            "primary_knowledge_source": "'infores:mmrrc'",
+            "aggregator_knowledge_source": "'infores:monarchinitiative'",
+        },
+    ),
+    "allele_to_genotype": (
+        "allele_to_genotype",
+        "csv_value(strain_id) != '' AND csv_value(allele_id) != ''",
+        {
+            "id": (
+                "edge_id(csv_value(strain_id), 'biolink:has_sequence_variant', csv_value(allele_id), 'infores:mmrrc')"
+            ),
+            "subject": "kgx_value(strain_id)",
+            "predicate": "'biolink:has_sequence_variant'",
+            "object": "kgx_value(allele_id)",
+            "category": "'biolink:GenotypeToVariantAssociation'",
+            "knowledge_level": "'knowledge_assertion'",
+            "agent_type": "'manual_agent'",
+            "primary_knowledge_source": "'infores:mmrrc'",
+            "aggregator_knowledge_source": "'infores:monarchinitiative'",
+        },
+    ),
+}
+
+
+def order_columns(columns: list[str], record_type: str) -> list[str]:
+    """Order KGX columns the way koza's TSVWriter does: core columns first, then the rest sorted."""
+    if record_type == "node":
+        core = ["id", "category", "name", "description", "xref", "provided_by", "synonym"]
+    else:
+        core = ["id", "subject", "predicate", "object", "category", "provided_by"]
+    rest = [column for column in columns if column not in core]
+    return (
+        [column for column in core if column in columns]
+        + sorted(column for column in rest if not column.startswith("_"))
+        + sorted(column for column in rest if column.startswith("_"))
+    )
+
+
+def export_query(name: str) -> tuple[str, str]:
+    """Return the KGX file name and the SQL query producing it for transform config ``name``."""
+    with (INGEST_DIR / "src" / f"{name}.yaml").open() as fh:
+        config = yaml.safe_load(fh)
+    table, row_filter, expressions = EXPORTS[name]
+    record_type = "node" if config["writer"].get("node_properties") else "edge"
+    columns = order_columns(config["writer"][f"{record_type}_properties"], record_type)
+
+    select = ",\n        ".join(f'{expressions.get(column, "NULL")} as "{column}"' for column in columns)
+    query = f"""
+    SELECT
+        {select}
+    FROM ({OUTPUTS[table].format(source="mmrrc")})
+    WHERE {row_filter}
+    ORDER BY {", ".join(TABLE_KEYS[table])}
+    """  # noqa: S608
+    return f"{config['name']}_{record_type}s.tsv", query
+
+
+def export_kgx(
+    input_file: Path, output_dir: Path, transforms: tuple[str, ...] = tuple(EXPORTS), max_rejected_lines: int = 0
+) -> dict[str, int]:
+    """
+    Write the KGX files for ``transforms`` directly from the catalog CSV.
+
+    Returns:
+        dict[str, int]: Rows written per KGX file name
+
+    Raises:
+        CatalogRejectsError: If more than ``max_rejected_lines`` catalog lines can't be parsed
+
+    """
+    con = duckdb.connect(":memory:")
+    con.execute(EDGE_ID_MACRO)
+    con.execute(KGX_VALUE_MACROS)
+    load_catalog(con, input_file)
+    try:
+        check_rejects(con, input_file, max_rejected_lines)
+    except CatalogRejectsError:
+        con.close()
+        raise
+    parse_mpt_ids(con, "mmrrc")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    counts = {}
+    for name in transforms:
+        file_name, query = export_query(name)
+        result = con.execute(
+            f"COPY ({query}) TO '{output_dir / file_name}' (HEADER, DELIMITER '\t', QUOTE '', ESCAPE '')"
+        ).fetchone()
+        counts[file_name] = result[0] if result else 0
+        print(f"  Wrote {counts[file_name]} rows to {file_name}")
+
+    con.close()
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export MMRRC KGX files directly from the catalog with DuckDB.")
+    parser.add_argument("input_csv", type=Path, nargs="?", default=INGEST_DIR / "data" / "mmrrc_catalog_data.csv")
+    parser.add_argument("output_dir", type=Path, nargs="?", default=INGEST_DIR / "output")
+    parser.add_argument(
+        "--max-rejected-lines",
+        type=int,
+        default=0,
+        help="Skip up to this many catalog lines that can't be parsed instead of failing (default: 0)",
+    )
+    args = parser.parse_args()
+
+    export_kgx(args.input_csv, args.output_dir, max_rejected_lines=args.max_rejected_lines)
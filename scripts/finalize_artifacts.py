@@ -0,0 +1,166 @@
+"""
+Compress and checksum the release artifacts in ``output/`` before publishing.
+
+Every KGX TSV is gzip-compressed to ``<name>.tsv.gz`` and every artifact is hashed with SHA-256.
+Files are read once, in fixed-size chunks, and the compressed bytes are hashed as they are written,
+so memory use doesn't grow with output size. Files are processed concurrently on a thread pool;
+zlib and hashlib release the GIL on large buffers, so the threads run on separate cores.
+
+Results are kept in a hash cache keyed on each file's name, size and modification time, so an
+artifact that hasn't changed since the last run is neither re-read nor re-compressed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import yaml
+
+from telemetry import TELEMETRY_FILE
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+ARTIFACT_SUFFIXES = {".tsv", ".gz", ".jsonl", ".nt"}
+HASH_CACHE_FILE = ".artifact-hashes.json"
+CHUNK_SIZE = 1 << 20
+
+
+class HashingWriter:
+    """A binary file wrapper that hashes everything written through it."""
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self.fh = fh
+        self.digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return self.fh.write(data)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+
+def file_state(path: Path) -> dict[str, int]:
+    """Return the size and modification time the hash cache is keyed on."""
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def hash_file(path: Path) -> dict[str, dict[str, Any]]:
+    """Return the SHA-256 and cache key of ``path``, keyed by its name."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return {path.name: {"sha256": digest.hexdigest(), **file_state(path)}}
+
+
+def compress_and_hash(path: Path, compresslevel: int = 6) -> dict[str, dict[str, Any]]:
+    """
+    Write ``<path>.gz`` and return the SHA-256 and cache key of both files, keyed by name.
+
+    The gzip header's timestamp is fixed, so unchanged content always compresses to the same bytes.
+    """
+    compressed_path = path.with_name(f"{path.name}.gz")
+    partial_path = path.with_name(f"{path.name}.gz.partial")
+    digest = hashlib.sha256()
+    with path.open("rb") as src, partial_path.open("wb") as raw:
+        writer = HashingWriter(raw)
+        with gzip.GzipFile(filename=path.name, mode="wb", compresslevel=compresslevel, fileobj=writer, mtime=0) as gz:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                gz.write(chunk)
+    os.replace(partial_path, compressed_path)
+    return {
+        path.name: {"sha256": digest.hexdigest(), **file_state(path)},
+        compressed_path.name: {"sha256": writer.digest.hexdigest(), **file_state(compressed_path)},
+    }
+
+
+def finalize_artifacts(
+    output_dir: Path, workers: int | None = None, compress: bool = True, compresslevel: int = 6
+) -> dict[str, dict[str, Any]]:
+    """
+    Compress the KGX TSVs in ``output_dir`` and checksum every artifact, reusing cached results.
+
+    Args:
+        output_dir: Directory holding the release artifacts
+        workers: Number of threads (default: one per CPU)
+        compress: Write ``<name>.tsv.gz`` next to each KGX TSV
+        compresslevel: gzip compression level, 1 (fastest) to 9 (smallest)
+
+    Returns:
+        dict[str, dict[str, Any]]: ``sha256``, ``size`` and ``mtime_ns`` per artifact file name
+
+    """
+    cache_file = output_dir / HASH_CACHE_FILE
+    cache = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+
+    def cached(path: Path) -> bool:
+        entry = cache.get(path.name)
+        if entry is None or not path.exists():
+            return False
+        state = file_state(path)
+        return entry["size"] == state["size"] and entry["mtime_ns"] == state["mtime_ns"]
+
+    tsvs = sorted(output_dir.glob("*.tsv")) if compress else []
+    compressed = {tsv.with_name(f"{tsv.name}.gz") for tsv in tsvs}
+    others = sorted(
+        path
+        for path in output_dir.iterdir()
+        if path.is_file()
+        and path.suffix in ARTIFACT_SUFFIXES
+        and path not in tsvs
+        and path not in compressed
+        and path.name != TELEMETRY_FILE.name
+    )
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = []
+        for tsv in tsvs:
+            gz = tsv.with_name(f"{tsv.name}.gz")
+            if cached(tsv) and cached(gz):
+                results.update({tsv.name: cache[tsv.name], gz.name: cache[gz.name]})
+            else:
+                futures.append(executor.submit(compress_and_hash, tsv, compresslevel))
+        for path in others:
+            if cached(path):
+                results[path.name] = cache[path.name]
+            else:
+                futures.append(executor.submit(hash_file, path))
+        for future in futures:
+            results.update(future.result())
+
+    results = dict(sorted(results.items()))
+    cache_file.write_text(json.dumps(results, indent=2) + "\n")
+    return results
+
+
+def add_checksums_to_metadata(metadata_file: Path, artifacts: dict[str, dict[str, Any]]) -> None:
+    """Add the size and SHA-256 of each artifact to ``metadata_file`` under ``artifact_checksums``."""
+    metadata = yaml.safe_load(metadata_file.read_text()) or {}
+    metadata["artifact_checksums"] = {
+        name: {"sha256": artifact["sha256"], "size": artifact["size"]} for name, artifact in artifacts.items()
+    }
+    metadata_file.write_text(yaml.safe_dump(metadata, sort_keys=False))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compress and checksum the release artifacts.")
+    parser.add_argument("output_dir", type=Path, nargs="?", default=INGEST_DIR / "output")
+    parser.add_argument("--workers", type=int, help="Threads to use (default: one per CPU)")
+    parser.add_argument("--no-compress", action="store_true", help="Only checksum, don't write .gz files")
+    parser.add_argument("--compresslevel", type=int, default=6, choices=range(1, 10))
+    args = parser.parse_args()
+
+    artifacts = finalize_artifacts(
+        args.output_dir, workers=args.workers, compress=not args.no_compress, compresslevel=args.compresslevel
+    )
+    for name, artifact in artifacts.items():
+        print(f"  {artifact['sha256']}  {name}")
@@ -0,0 +1,570 @@
+"""
+Run the MMRRC ingest in a single Python process tree: preprocess once, then all transforms in parallel.
+
+Each transform config runs in its own worker process. Workers are forked from a server that has already
+imported koza and the Biolink model, so that import cost is paid once rather than once per transform, and
+never in this process: koza is only imported where a transform actually runs.
+A transform whose output falls below its configured ``min_node_count``/``min_edge_count`` fails the run,
+and the remaining transforms are cancelled. Telemetry for preprocessing and each transform is appended to
+``output/telemetry.jsonl`` (see ``telemetry.py``). With ``--if-changed`` nothing is rebuilt when the catalog,
+the preprocess and transform code, the configs and the package versions all match the ones the current
+output was built from, and with ``--stage-cache`` any stage whose
+inputs, code and package versions are unchanged is restored from the cache instead (see ``stage_cache.py``).
+With ``--store`` preprocessing also writes the indexed DuckDB store, and the transforms read their rows from
+it with DuckDB rather than parsing the processed CSVs (see ``src/store_rows.py``). With ``--profile-dir`` (or
+``MMRRC_PROFILE_DIR``) each transform is profiled and each preprocess query explained (see ``profiling.py``).
+With ``--shards N`` each transform's input is split into N parts by a hash of ``strain_id``, the parts are
+transformed in parallel in the same pool (with ``--store``, each shard reads its rows from the store
+directly), and their KGX files are merged back in ``strain_id`` order, so the
+output is identical to an unsharded run's and the minimum counts are checked against the merged totals.
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+from concurrent.futures import FIRST_EXCEPTION, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from pathlib import Path
+
+import duckdb
+import yaml
+
+from catalog_store import STORE_FILE
+from preprocess import OUTPUTS, TABLE_KEYS, preprocess_mmrrc
+from profiling import env_profile_dir, profile_stage
+from stage_cache import STAGE_CACHE_DIR, StageCache, hash_inputs, transform_code_files
+from telemetry import TELEMETRY_FILE, record_stage
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+# The transforms import the shared modules in src as the src package
+sys.path.insert(0, str(INGEST_DIR))
+
+TRANSFORMS = ("genotype", "genotype_to_phenotype", "allele_to_genotype")
+
+# Imported by the fork server before any worker starts
+PRELOAD_MODULES = ["koza", "biolink_model.datamodel.pydanticmodel_v2"]
+
+# The scripts preprocess.py runs, all of which its output depends on
+PREPROCESS_MODULES = ("preprocess.py", "catalog_store.py", "catalog_archive.py", "profiling.py", "telemetry.py")
+
+# Records the stage keys the output directory was last built with
+BUILD_SOURCE_FILE = ".build-source.json"
+
+# Where sharded runs split their inputs and write each shard's KGX files, under the output directory
+SHARD_DIR = ".shards"
+
+# KGX file kind -> the column holding the strain ID, which sharded outputs are merged on
+MERGE_COLUMNS = {"node": "id", "edge": "subject"}
+
+
+class MinCountError(RuntimeError):
+    """Raised when a transform writes fewer nodes or edges than its config requires."""
+
+
+def count_rows(path: Path) -> int:
+    """Count the data rows in a KGX TSV file, excluding its header."""
+    with path.open() as fh:
+        return max(sum(1 for _ in fh) - 1, 0)
+
+
+def preprocess_key(input_file: Path) -> str:
+    """Return the stage cache key of preprocessing ``input_file``."""
+    code_files = [INGEST_DIR / "scripts" / module for module in PREPROCESS_MODULES]
+    return hash_inputs([input_file, *code_files], ["duckdb"])
+
+
+def transform_code_key(name: str) -> str:
+    """Return the hash of everything transform ``name``'s output depends on besides its input files."""
+    return hash_inputs(transform_code_files(name), ["koza", "biolink-model"])
+
+
+def build_keys(input_file: Path, transforms: tuple[str, ...], validation: str | int | None = None) -> dict:
+    """Return what ``BUILD_SOURCE_FILE`` records: preprocessing's key, each transform's code key and the validation."""
+    return {
+        "preprocess": preprocess_key(input_file),
+        "transforms": {name: transform_code_key(name) for name in transforms},
+        "validation": validation,
+    }
+
+
+def source_unchanged(
+    input_file: Path, output_dir: Path, transforms: tuple[str, ...] = TRANSFORMS, validation: str | int | None = None
+) -> bool:
+    """
+    Return whether ``transforms`` were last built into ``output_dir`` with the same keys and validation as now.
+
+    Preprocessing's key covers the catalog, so together with each transform's code key it determines the
+    transform's input files too.
+    """
+    build_source = output_dir / BUILD_SOURCE_FILE
+    if not build_source.exists():
+        return False
+    built = json.loads(build_source.read_text())
+    keys = build_keys(input_file, transforms, validation)
+    return (
+        built.get("preprocess") == keys["preprocess"]
+        and built.get("validation") == keys["validation"]
+        and all(built.get("transforms", {}).get(name) == key for name, key in keys["transforms"].items())
+    )
+
+
+def load_config(name: str) -> dict:
+    """Return the koza config ``src/<name>.yaml``."""
+    with (INGEST_DIR / "src" / f"{name}.yaml").open() as fh:
+        return yaml.safe_load(fh)
+
+
+def kgx_file_names(name: str) -> list[str]:
+    """Return the names of the node and edge files transform ``name`` can write."""
+    config_name = load_config(name)["name"]
+    return [f"{config_name}_{kind}s.tsv" for kind in ("node", "edge")]
+
+
+def table_files(file: str, input_dir: Path) -> list[Path]:
+    """Return the shard files of the config input ``file`` in ``input_dir``, or the single CSV if it isn't sharded."""
+    shard_dir = input_dir / Path(file).stem
+    shard_files = sorted(shard_dir.glob("part-*.csv")) if shard_dir.is_dir() else []
+    return shard_files or [input_dir / Path(file).name]
+
+
+def transform_input_files(name: str, input_dir: Path) -> list[Path]:
+    """
+    Return the files transform ``name`` reads from ``input_dir``.
+
+    Each ``<table>.csv`` listed in the config is replaced by the shard files in ``<table>/``, if
+    ``preprocess.py --shards`` wrote the table that way.
+    """
+    files = load_config(name)["reader"]["files"]
+    return [input_file for file in files for input_file in table_files(file, input_dir)]
+
+
+def split_inputs(name: str, input_dir: Path, work_dir: Path, shards: int) -> list[Path]:
+    """
+    Split the tables transform ``name`` reads into ``shards`` input directories by a hash of ``strain_id``.
+
+    Shard ``k`` gets its rows of each table as ``<work_dir>/shard-kkkk/<table>.csv``, sorted on the
+    table's keys, so every shard is a complete input directory for ``run_transform``, all of a strain's
+    rows are in the same shard, and the shards' outputs can be merged in strain order however the inputs
+    were ordered.
+
+    Returns:
+        list[Path]: The shard input directories
+
+    """
+    shard_dirs = [work_dir / f"shard-{shard:04d}" for shard in range(shards)]
+    for shard_dir in shard_dirs:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+    con = duckdb.connect(":memory:")
+    tables = {Path(file).stem: file for file in load_config(name)["reader"]["files"]}
+    for table, file in tables.items():
+        files = [str(input_file) for input_file in table_files(file, input_dir)]
+        source = f"read_csv({files}, header=true, all_varchar=true)"
+        con.execute(f"CREATE TABLE all_{table} AS SELECT *, hash(strain_id) % {shards} AS _shard FROM {source}")  # noqa: S608
+
+    for shard, shard_dir in enumerate(shard_dirs):
+        for table in tables:
+            con.execute(f"""
+                COPY (
+                    SELECT * EXCLUDE (_shard) FROM all_{table} WHERE _shard = {shard}
+                    ORDER BY {", ".join(TABLE_KEYS[table])}
+                ) TO '{shard_dir / f"{table}.csv"}' (FORMAT CSV, HEADER, DELIMITER ',')
+            """)  # noqa: S608
+    con.close()
+    return shard_dirs
+
+
+def merge_kgx_files(kgx_files: list[Path], merged_file: Path, column: str) -> int:
+    """
+    Merge the shards' KGX files into ``merged_file`` in order of ``column``, and return the rows written.
+
+    ``split_inputs`` sorts each shard's input, so each shard's file is in strain order, and a strain's rows
+    are all in one shard. Merging on the strain ID column therefore writes the rows in the order an unsharded
+    run writes them from inputs sorted on their keys, as preprocess writes them by default.
+    """
+    with ExitStack() as stack, merged_file.open("w") as out:
+        files = [stack.enter_context(kgx_file.open()) for kgx_file in kgx_files]
+        header = [next(fh, "") for fh in files][0]
+        out.write(header)
+        position = header.rstrip("\n").split("\t").index(column)
+        rows = 0
+        for line in heapq.merge(*files, key=lambda line: line.split("\t", position + 1)[position]):
+            out.write(line)
+            rows += 1
+    return rows
+
+
+def merge_shards(
+    name: str, shard_dirs: list[Path], output_dir: Path, telemetry_file: Path | None = None
+) -> dict[str, int]:
+    """Merge the KGX files transform ``name`` wrote to each shard's ``output`` directory into ``output_dir``."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    kgx_files = [output_dir / file_name for file_name in kgx_file_names(name)]
+    counts = {}
+    with record_stage(f"transform.{name}.merge", telemetry_file, kgx_files) as stats:
+        for kind, kgx_file in zip(("node", "edge"), kgx_files):
+            shard_files = [shard_dir / "output" / kgx_file.name for shard_dir in shard_dirs]
+            shard_files = [shard_file for shard_file in shard_files if shard_file.exists()]
+            if shard_files:
+                counts[kgx_file.name] = merge_kgx_files(shard_files, kgx_file, MERGE_COLUMNS[kind])
+        stats["rows"] = sum(counts.values())
+    return counts
+
+
+def check_min_counts(name: str, counts: dict[str, int]) -> None:
+    """Raise MinCountError if ``counts`` fall below transform ``name``'s min_node_count/min_edge_count."""
+    writer = load_config(name)["writer"]
+    for kind, file_name in zip(("node", "edge"), kgx_file_names(name)):
+        minimum = writer.get(f"min_{kind}_count")
+        if file_name in counts and minimum is not None and counts[file_name] < minimum:
+            raise MinCountError(
+                f"{name}: wrote {counts[file_name]} {kind}s, below the configured min_{kind}_count of {minimum}"
+            )
+
+
+def run_transform(
+    name: str,
+    output_dir: Path,
+    input_dir: Path | None = None,
+    check_counts: bool = True,
+    telemetry_file: Path | None = None,
+    store_file: Path | None = None,
+    row_limit: int = 0,
+    profile_dir: Path | None = None,
+    stage: str | None = None,
+    validation: str | int | None = None,
+    shard: tuple[int, int] | None = None,
+) -> dict[str, int]:
+    """
+    Run the koza transform ``src/<name>.yaml`` and count what it wrote.
+
+    Args:
+        name: Transform config name, e.g. ``"genotype"``
+        output_dir: Directory for the KGX files
+        input_dir: Read the config's input files, or their shards, from this directory instead of data/processed
+        check_counts: Raise MinCountError if the config's min_node_count/min_edge_count isn't met
+        telemetry_file: Append a telemetry record for the transform to this JSON lines file
+        store_file: Read rows from this catalog store instead of the config's input files (see ``src/store_rows.py``)
+        row_limit: Transform only this many input rows (0 for all)
+        profile_dir: Write a cProfile profile and collapsed stacks of the transform here
+        stage: Name of the transform in telemetry and profiles (default: ``transform.<name>``)
+        validation: Validate records as this ``validation`` setting says (``always``, ``off`` or every Nth,
+            see ``src/records.py``) instead of as the config does
+        shard: ``(k, n)`` to read only the store rows whose ``strain_id`` hashes to ``k`` modulo ``n``
+
+    Returns:
+        dict[str, int]: Rows written per KGX file name
+
+    """
+    # Imported here so that importing this module, e.g. to skip an unchanged build, doesn't load the Biolink model
+    from koza import KozaRunner
+
+    config_file = INGEST_DIR / "src" / f"{name}.yaml"
+
+    stage = stage or f"transform.{name}"
+    input_files = None
+    if input_dir is not None:
+        input_files = [str(file.resolve()) for file in transform_input_files(name, input_dir)]
+
+    # Counts are checked here against the files actually written, the same way for every koza version
+    overrides: dict[str, dict] = {"writer": {"min_node_count": None, "min_edge_count": None}, "transform": {}}
+    if validation is not None:
+        overrides["transform"]["validation"] = validation
+    if store_file is not None:
+        # The transform hooks read these tables from the store, so koza never opens its input files
+        overrides["transform"]["store"] = {
+            "file": str(store_file),
+            "tables": [Path(file).stem for file in load_config(name)["reader"]["files"]],
+            "shard": list(shard) if shard is not None else None,
+            "row_limit": row_limit,
+        }
+    config, runner = KozaRunner.from_config_file(
+        str(config_file),
+        output_dir=str(output_dir),
+        input_files=input_files,
+        row_limit=row_limit,
+        overrides=overrides,
+    )
+    kgx_files = [output_dir / f"{config.name}_{kind}s.tsv" for kind in ("node", "edge")]
+    with record_stage(stage, telemetry_file, kgx_files) as stats:
+        with profile_stage(stage, profile_dir):
+            runner.run()
+        counts = {kgx_file.name: count_rows(kgx_file) for kgx_file in kgx_files if kgx_file.exists()}
+        stats["rows"] = sum(counts.values())
+
+    if check_counts:
+        check_min_counts(name, counts)
+    return counts
+
+
+def run_transforms(
+    output_dir: Path,
+    input_dir: Path | None = None,
+    transforms: tuple[str, ...] = TRANSFORMS,
+    workers: int | None = None,
+    check_counts: bool = True,
+    telemetry_file: Path | None = None,
+    store_file: Path | None = None,
+    profile_dir: Path | None = None,
+    shards: int | None = None,
+    validation: str | int | None = None,
+) -> dict[str, dict[str, int]]:
+    """
+    Run the transforms concurrently in a process pool.
+
+    With ``shards``, each transform's input is split by ``split_inputs``, or with ``store_file`` read from
+    the store a shard at a time, and every shard runs as its own task in the pool, writing to
+    ``<output_dir>/.shards/``. A transform's shards are merged into
+    ``output_dir`` once they've all finished, and its minimum counts checked against the merged files.
+
+    Returns:
+        dict[str, dict[str, int]]: Rows written per KGX file name, for each transform
+
+    Raises:
+        The first exception raised by any transform. Transforms still queued are cancelled and
+        running ones are terminated rather than left to finish.
+
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+    else:
+        context = multiprocessing.get_context("spawn")
+
+    shard_dirs = {}
+    if shards:
+        split_dir = input_dir or INGEST_DIR / "data" / "processed"
+        for name in transforms:
+            work_dir = output_dir / SHARD_DIR / name
+            if store_file is not None:
+                # Each shard reads its own rows from the store, so there's nothing to split
+                shard_dirs[name] = [work_dir / f"shard-{shard:04d}" for shard in range(shards)]
+            else:
+                shard_dirs[name] = split_inputs(name, split_dir, work_dir, shards)
+        # Shard tasks are CPU-bound, so there's no point in more workers than cores
+        default_workers = min(len(transforms) * shards, os.cpu_count() or 1)
+    else:
+        default_workers = len(transforms)
+
+    executor = ProcessPoolExecutor(max_workers=workers or default_workers, mp_context=context)
+    futures: dict[Future, str] = {}
+    for name in transforms:
+        if name in shard_dirs:
+            for shard, shard_dir in enumerate(shard_dirs[name]):
+                stage = f"transform.{name}.{shard_dir.name}"
+                future = executor.submit(
+                    run_transform,
+                    name,
+                    shard_dir / "output",
+                    shard_dir if store_file is None else None,
+                    False,
+                    telemetry_file,
+                    store_file,
+                    profile_dir=profile_dir,
+                    stage=stage,
+                    validation=validation,
+                    shard=(shard, shards) if store_file is not None else None,
+                )
+                futures[future] = name
+        else:
+            future = executor.submit(
+                run_transform,
+                name,
+                output_dir,
+                input_dir,
+                check_counts,
+                telemetry_file,
+                store_file,
+                profile_dir=profile_dir,
+                validation=validation,
+            )
+            futures[future] = name
+
+    try:
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = [future for future in done if future.exception() is not None]
+        if failed:
+            # ProcessPoolExecutor can't stop a running task, so stop its workers directly
+            for process in list(getattr(executor, "_processes", {}).values()):
+                process.terminate()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise failed[0].exception()
+        executor.shutdown()
+
+        results = {name: future.result() for future, name in futures.items() if name not in shard_dirs}
+        for name, dirs in shard_dirs.items():
+            results[name] = merge_shards(name, dirs, output_dir, telemetry_file)
+            if check_counts:
+                check_min_counts(name, results[name])
+    finally:
+        shutil.rmtree(output_dir / SHARD_DIR, ignore_errors=True)
+    return {name: results[name] for name in transforms}
+
+
+def run_pipeline(
+    input_file: Path,
+    processed_dir: Path,
+    output_dir: Path,
+    transforms: tuple[str, ...] = TRANSFORMS,
+    workers: int | None = None,
+    preprocess: bool = True,
+    check_counts: bool = True,
+    telemetry_file: Path | None = None,
+    if_changed: bool = False,
+    stage_cache: StageCache | None = None,
+    store: bool = False,
+    profile_dir: Path | None = None,
+    shards: int | None = None,
+    validation: str | int | None = None,
+) -> dict[str, dict[str, int]] | None:
+    """
+    Preprocess ``input_file`` into ``processed_dir`` (unless ``preprocess`` is False), then run the transforms.
+
+    With a ``stage_cache``, preprocessing and each transform are restored from the cache when their
+    inputs haven't changed, and only the rest are run. Restored transforms are still count-checked.
+    With ``store``, preprocessing also writes ``<processed_dir>/mmrrc.duckdb`` and the transforms read from it.
+    With ``profile_dir``, the preprocess queries and transforms that run are profiled into it; stages
+    restored from the cache aren't. With ``shards``, each transform runs as that many shards in parallel
+    (see ``run_transforms``); the merged output is the same, so it shares cache entries with unsharded runs.
+    With ``validation``, every transform validates records as that setting says rather than as its config
+    does, e.g. ``1000`` to validate only every 1000th; such runs are cached as separate stages.
+
+    Returns:
+        dict[str, dict[str, int]] | None: Rows written per KGX file name for each transform, or None if
+        ``if_changed`` is set and the output was already built from an identical catalog with the same code
+
+    """
+    if if_changed and source_unchanged(input_file, output_dir, transforms, validation):
+        return None
+    build_source = build_keys(input_file, transforms, validation)
+
+    store_file = processed_dir / STORE_FILE if store else None
+    if preprocess:
+        key = build_source["preprocess"]
+        # Runs with and without the store have different outputs, so they're cached as separate stages
+        stage = "preprocess.store" if store else "preprocess"
+        if stage_cache is not None and stage_cache.restore(stage, key, processed_dir):
+            # The cache holds the single-CSV layout; drop the shards of an earlier sharded preprocess,
+            # which the transforms would otherwise read in its place
+            for table in OUTPUTS:
+                shutil.rmtree(processed_dir / table, ignore_errors=True)
+        else:
+            preprocess_mmrrc(
+                input_file, processed_dir, telemetry_file=telemetry_file, store_file=store_file, profile_dir=profile_dir
+            )
+            if stage_cache is not None:
+                outputs = [processed_dir / f"{table}.csv" for table in OUTPUTS]
+                stage_cache.store(stage, key, [*outputs, store_file] if store_file else outputs)
+
+    results = {}
+    keys = {}
+    # Validating a different sample can skip different invalid records, so such runs are cached separately
+    stages = {
+        name: f"transform.{name}" if validation is None else f"transform.{name}.{validation}" for name in transforms
+    }
+    if stage_cache is not None:
+        for name in transforms:
+            input_files = transform_input_files(name, processed_dir)
+            keys[name] = hash_inputs([*input_files, *transform_code_files(name)], ["koza", "biolink-model"])
+            if stage_cache.restore(stages[name], keys[name], output_dir):
+                kgx_files = [output_dir / file_name for file_name in kgx_file_names(name)]
+                results[name] = {kgx_file.name: count_rows(kgx_file) for kgx_file in kgx_files if kgx_file.exists()}
+                if check_counts:
+                    check_min_counts(name, results[name])
+
+    to_run = tuple(name for name in transforms if name not in results)
+    if to_run:
+        results.update(
+            run_transforms(
+                output_dir,
+                processed_dir,
+                to_run,
+                workers,
+                check_counts=check_counts,
+                telemetry_file=telemetry_file,
+                store_file=store_file,
+                profile_dir=profile_dir,
+                shards=shards,
+                validation=validation,
+            )
+        )
+    if stage_cache is not None:
+        for name in to_run:
+            stage_cache.store(stages[name], keys[name], [output_dir / file for file in kgx_file_names(name)])
+        stage_cache.print_report()
+    results = {name: results[name] for name in transforms}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / BUILD_SOURCE_FILE).write_text(json.dumps(build_source) + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Preprocess the MMRRC catalog and run all transforms in parallel.")
+    parser.add_argument("input_csv", type=Path, nargs="?", default=INGEST_DIR / "data" / "mmrrc_catalog_data.csv")
+    parser.add_argument("--processed-dir", type=Path, default=INGEST_DIR / "data" / "processed")
+    parser.add_argument("--output-dir", type=Path, default=INGEST_DIR / "output")
+    parser.add_argument("--transform", dest="transforms", action="append", choices=TRANSFORMS)
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per transform)")
+    parser.add_argument("--skip-preprocess", action="store_true", help="Reuse the existing processed CSVs")
+    parser.add_argument("--telemetry-file", type=Path, default=TELEMETRY_FILE, help="JSON lines file for telemetry")
+    parser.add_argument("--if-changed", action="store_true", help="Skip the build if the catalog hasn't changed")
+    parser.add_argument(
+        "--stage-cache",
+        type=Path,
+        nargs="?",
+        const=STAGE_CACHE_DIR,
+        help=f"Reuse unchanged stages' outputs from this cache (default: {STAGE_CACHE_DIR.relative_to(INGEST_DIR)})",
+    )
+    parser.add_argument(
+        "--store", action="store_true", help="Write the indexed DuckDB store and have the transforms read from it"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=env_profile_dir(),
+        help="Write profiles of each transform and preprocess query here (default: $MMRRC_PROFILE_DIR)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Split each transform's input into this many parts by strain_id hash and run them in parallel",
+    )
+    parser.add_argument(
+        "--validation",
+        help="Validate records as this setting says instead of as the configs do: always, off, or N for every Nth",
+    )
+    args = parser.parse_args()
+
+    try:
+        results = run_pipeline(
+            args.input_csv,
+            args.processed_dir,
+            args.output_dir,
+            transforms=tuple(args.transforms or TRANSFORMS),
+            workers=args.workers,
+            preprocess=not args.skip_preprocess,
+            telemetry_file=args.telemetry_file,
+            if_changed=args.if_changed,
+            stage_cache=StageCache(args.stage_cache) if args.stage_cache else None,
+            store=args.store,
+            profile_dir=args.profile_dir,
+            shards=args.shards,
+            validation=args.validation,
+        )
+    except Exception as e:
+        print(f"Pipeline failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if results is None:
+        print(f"{args.input_csv} is unchanged since {args.output_dir} was built; nothing to do")
+        sys.exit(0)
+
+    print("\nTransforms complete!")
+    for name, counts in results.items():
+        for file_name, count in counts.items():
+            print(f"  {name}: {file_name} {count} rows")
@@ -5,137 +5,656 @@ This script normalizes the denormalized MMRRC catalog CSV into three separate fi
 1. genotypes.csv - One row per unique genotype
 2. genotype_to_phenotype.csv - One row per genotype-phenotype association
 3. allele_to_genotype.csv - One row per allele-genotype association
+
+The catalog is read against a declared, versioned schema (``CATALOG_COLUMNS``) rather than sniffed:
+its header is checked against the schema before any data is read, so upstream column changes fail
+immediately with the columns that differ. Lines that don't parse are set aside in a rejects table
+and reported, and preprocessing fails if there are any, unless ``--max-rejected-lines`` allows
+them. ``ACCEPTED_DATE`` is written out as the catalog's own text; the loaded catalog (and so the
+store) also has it parsed into an ``ACCEPTED_DATE_PARSED`` date, NULL where it isn't MM/DD/YYYY.
+
+The catalog is scanned exactly once: only the columns the outputs need are loaded into
+a DuckDB table, all three outputs are derived from that table, and row counts are taken
+from the results of the ``COPY`` statements rather than by re-reading the written files.
+
+With ``--snapshot-dir`` the normalized tables are compared against the snapshot left by the
+previous run, and the added, changed and removed rows are written to ``<output_dir>/delta/``
+(see ``scripts/transform_delta.py``). This release's tables are staged as the next snapshot, and
+``transform_delta.py`` moves them into place only once the delta has been transformed, so a failed
+run can simply be repeated against the same snapshot.
+
+With ``--streaming`` the catalog is never materialized: it is read once to count its rows and find
+rejected lines before anything is written, once to count the MPT_IDS fragments, and then once by each
+output's ``COPY``, which derives the fragments it needs as it goes. DuckDB runs under the given
+``--memory-limit``/``--threads`` and spills to ``--temp-directory`` instead of growing past the
+limit, and the peak memory of the run is reported at the end. ``--snapshot-dir``, ``--store`` and
+``--archive-dir`` read the normalized tables again, so with any of them each output is still
+materialized as a DuckDB table, spilling past the memory limit, and written from that table.
+
+Outputs are sorted on their table keys by default, so reruns are byte-identical. ``--unordered``
+skips that global sort, and ``--shards N`` writes each table as N files partitioned by a hash of
+``strain_id``, written in parallel, to ``<output_dir>/<table>/part-NNNN.csv``; sorted within each
+shard unless ``--unordered`` is also given. The single CSV is then removed, so sharded output has to
+be transformed through ``pipeline.py`` (e.g. ``pipeline.py --skip-preprocess``), which points the koza
+configs at the shard files in place of the single CSV; plain ``koza transform`` only reads ``<table>.csv``.
+
+With ``--store`` the loaded catalog and the normalized tables are also written, sorted and indexed,
+to a DuckDB file (see ``scripts/catalog_store.py``) that the transforms can read instead of the CSVs.
+
+With ``--archive-dir`` the rows added and removed since the previous archived release are appended
+to a Parquet archive partitioned by release version (``--release``, by default the downloaded
+catalog's version), which answers history queries across releases (see ``scripts/catalog_archive.py``).
+
+With ``--profile-dir`` (or ``MMRRC_PROFILE_DIR``) every query is profiled by DuckDB and the
+``EXPLAIN ANALYZE`` output and collapsed operator stacks of each step are written to that directory
+(see ``scripts/profiling.py``).
 """
 
+import csv
+import shutil
 from pathlib import Path
 
 import duckdb
 
+from catalog_archive import archive_release, check_release, source_version
+from catalog_store import write_store
+from profiling import QueryProfiler, env_profile_dir, profile_queries
+from telemetry import peak_memory_bytes, record_stage
 
-def preprocess_mmrrc(input_file: Path, output_dir: Path) -> None:
-    """Preprocess MMRRC catalog data into normalized CSV files using DuckDB."""
-    output_dir.mkdir(parents=True, exist_ok=True)
+# The MMRRC catalog's columns, in file order. Update this and bump the version whenever upstream
+# changes the layout; a catalog whose header doesn't match is refused before any data is read.
+CATALOG_SCHEMA_VERSION = 1
+CATALOG_COLUMNS = (
+    "STRAIN/STOCK_ID",
+    "STRAIN/STOCK_DESIGNATION",
+    "OTHER_NAMES",
+    "STRAIN_TYPE",
+    "STATE",
+    "MGI_ALLELE_ACCESSION_ID",
+    "ALLELE_SYMBOL",
+    "ALLELE_NAME",
+    "MUTATION_TYPE",
+    "CHROMOSOME",
+    "MGI_GENE_ACCESSION_ID",
+    "GENE_SYMBOL",
+    "GENE_NAME",
+    "SDS_URL",
+    "ACCEPTED_DATE",
+    "MPT_IDS",
+    "PUBMED_IDS",
+    "RESEARCH_AREAS",
+)
+
+# Typed columns loaded alongside the catalog's text -> the expression parsing them. The outputs keep
+# the text; a value that doesn't parse is NULL in the typed column rather than rejecting the line.
+TYPED_COLUMNS = {
+    "ACCEPTED_DATE_PARSED": """try_strptime("ACCEPTED_DATE", '%m/%d/%Y')::DATE""",
+}
 
-    print(f"Reading {input_file} into DuckDB...")
-    con = duckdb.connect(":memory:")
-
-    # Load the CSV file, treating all columns as VARCHAR to avoid type issues
-    con.execute(f"""
-        CREATE TABLE mmrrc AS
-        SELECT * FROM read_csv_auto('{input_file}', all_varchar=true)
-    """)  # noqa: S608
-
-    # Get row count
-    result = con.execute("SELECT COUNT(*) FROM mmrrc").fetchone()
-    total_rows = result[0] if result else 0
-    print(f"Loaded {total_rows} rows")
-
-    # 1. Create genotypes.csv - one row per unique STRAIN/STOCK_ID
-    print("\nCreating genotypes.csv...")
-    genotypes_file = output_dir / "genotypes.csv"
-
-    con.execute(f"""
-        COPY (
-            SELECT DISTINCT
-                "STRAIN/STOCK_ID" as strain_id,
-                FIRST("STRAIN/STOCK_DESIGNATION") as strain_designation,
-                FIRST(OTHER_NAMES) as other_names,
-                FIRST(STRAIN_TYPE) as strain_type,
-                FIRST(STATE) as state,
-                FIRST(MUTATION_TYPE) as mutation_type,
-                FIRST(CHROMOSOME) as chromosome,
-                FIRST(SDS_URL) as sds_url,
-                FIRST(ACCEPTED_DATE) as accepted_date,
-                FIRST(RESEARCH_AREAS) as research_areas,
-                FIRST(PUBMED_IDS) as pubmed_ids,
-                FIRST(MPT_IDS) as mpt_ids_raw
-            FROM mmrrc
-            GROUP BY "STRAIN/STOCK_ID"
-            ORDER BY "STRAIN/STOCK_ID"
-        ) TO '{genotypes_file}' (HEADER, DELIMITER ',')
-    """)  # noqa: S608
-
-    result = con.execute(f"SELECT COUNT(*) FROM read_csv_auto('{genotypes_file}')").fetchone()  # noqa: S608
-    genotype_count = result[0] if result else 0
-    print(f"  Wrote {genotype_count} unique genotypes")
-
-    # 2. Create allele_to_genotype.csv - one row per allele-genotype pair
-    print("\nCreating allele_to_genotype.csv...")
-    allele_genotypes_file = output_dir / "allele_to_genotype.csv"
-
-    con.execute(f"""
-        COPY (
-            SELECT DISTINCT
-                MGI_ALLELE_ACCESSION_ID as allele_id,
-                ALLELE_SYMBOL as allele_symbol,
-                ALLELE_NAME as allele_name,
-                "STRAIN/STOCK_ID" as strain_id,
-                MUTATION_TYPE as mutation_type,
-                CHROMOSOME as chromosome
-            FROM mmrrc
-            WHERE MGI_ALLELE_ACCESSION_ID IS NOT NULL
-              AND MGI_ALLELE_ACCESSION_ID != ''
-            ORDER BY "STRAIN/STOCK_ID", MGI_ALLELE_ACCESSION_ID
-        ) TO '{allele_genotypes_file}' (HEADER, DELIMITER ',')
-    """)  # noqa: S608
-
-    result = con.execute(f"SELECT COUNT(*) FROM read_csv_auto('{allele_genotypes_file}')").fetchone()  # noqa: S608
-    allele_count = result[0] if result else 0
-    print(f"  Wrote {allele_count} allele-genotype associations")
-
-    # 3. Create genotype_to_phenotype.csv - explode MP IDs from MPT_IDS field
-    print("\nCreating genotype_to_phenotype.csv...")
-    genotype_phenotypes_file = output_dir / "genotype_to_phenotype.csv"
-
-    # First, create a table with exploded MP IDs
-    con.execute("""
-        CREATE TABLE phenotype_associations AS
+# Catalog columns referenced by the normalized outputs; everything else is never loaded.
+SOURCE_COLUMNS = (
+    "STRAIN/STOCK_ID",
+    "STRAIN/STOCK_DESIGNATION",
+    "OTHER_NAMES",
+    "STRAIN_TYPE",
+    "STATE",
+    "MGI_ALLELE_ACCESSION_ID",
+    "ALLELE_SYMBOL",
+    "ALLELE_NAME",
+    "MUTATION_TYPE",
+    "CHROMOSOME",
+    "SDS_URL",
+    "ACCEPTED_DATE",
+    "MPT_IDS",
+    "PUBMED_IDS",
+    "RESEARCH_AREAS",
+)
+
+# A strain's catalog lines normally repeat the same strain-level values; MIN picks one
+# deterministically if they ever differ, regardless of scan order or thread count.
+GENOTYPES_QUERY = """
+    SELECT
+        "STRAIN/STOCK_ID" as strain_id,
+        MIN("STRAIN/STOCK_DESIGNATION") as strain_designation,
+        MIN(OTHER_NAMES) as other_names,
+        MIN(STRAIN_TYPE) as strain_type,
+        MIN(STATE) as state,
+        MIN(MUTATION_TYPE) as mutation_type,
+        MIN(CHROMOSOME) as chromosome,
+        MIN(SDS_URL) as sds_url,
+        MIN(ACCEPTED_DATE) as accepted_date,
+        MIN(RESEARCH_AREAS) as research_areas,
+        MIN(PUBMED_IDS) as pubmed_ids,
+        MIN(MPT_IDS) as mpt_ids_raw
+    FROM {source}
+    GROUP BY "STRAIN/STOCK_ID"
+"""
+
+ALLELE_TO_GENOTYPE_QUERY = """
+    SELECT DISTINCT
+        MGI_ALLELE_ACCESSION_ID as allele_id,
+        ALLELE_SYMBOL as allele_symbol,
+        ALLELE_NAME as allele_name,
+        "STRAIN/STOCK_ID" as strain_id,
+        MUTATION_TYPE as mutation_type,
+        CHROMOSOME as chromosome
+    FROM {source}
+    WHERE MGI_ALLELE_ACCESSION_ID IS NOT NULL
+      AND MGI_ALLELE_ACCESSION_ID != ''
+"""
+
+# Split each distinct MPT_IDS value into its ``label [MP:nnnnnnn]`` fragments in a single pass and
+# parse every fragment with one constant pattern. Fragments that don't match are kept with an
+# empty mp_id so they can be counted rather than silently dropped. Created as a table, or as a view
+# when streaming, so the fragments are derived inside whichever query reads them.
+MPT_FRAGMENTS_QUERY = """
+    CREATE TEMP {relation} mpt_fragments AS
+    WITH annotated AS (
         SELECT DISTINCT
             "STRAIN/STOCK_ID" as strain_id,
-            UNNEST(regexp_extract_all(MPT_IDS, 'MP:\\d+')) as mp_id,
             MPT_IDS as mpt_ids_raw
-        FROM mmrrc
+        FROM {source}
         WHERE MPT_IDS IS NOT NULL
           AND MPT_IDS != ''
-          AND regexp_extract_all(MPT_IDS, 'MP:\\d+') IS NOT NULL
-    """)
-
-    # Now extract phenotype labels for each MP ID
-    # We'll extract the text before each [MP:XXXXXX] pattern
-    con.execute(f"""
-        COPY (
-            SELECT DISTINCT
-                strain_id,
-                mp_id as phenotype_id,
-                regexp_extract(
-                    mpt_ids_raw,
-                    '([^|\\[]+)\\s*\\[' || mp_id || '\\]',
-                    1
-                ) as phenotype_label
-            FROM phenotype_associations
-            WHERE mp_id IS NOT NULL
-            ORDER BY strain_id, mp_id
-        ) TO '{genotype_phenotypes_file}' (HEADER, DELIMITER ',')
-    """)  # noqa: S608
-
-    result = con.execute(f"SELECT COUNT(*) FROM read_csv_auto('{genotype_phenotypes_file}')").fetchone()  # noqa: S608
-    phenotype_count = result[0] if result else 0
-    print(f"  Wrote {phenotype_count} genotype-phenotype associations")
+    ), fragments AS (
+        SELECT strain_id, UNNEST(string_split(mpt_ids_raw, '|')) as fragment
+        FROM annotated
+    )
+    SELECT
+        strain_id,
+        fragment,
+        regexp_extract(fragment, '^([^\\[]*)\\[(MP:\\d+)\\]\\s*$', ['label', 'mp_id']) as parsed
+    FROM fragments
+    WHERE trim(fragment) != ''
+"""
+
+GENOTYPE_TO_PHENOTYPE_QUERY = """
+    SELECT DISTINCT
+        strain_id,
+        parsed.mp_id as phenotype_id,
+        parsed.label as phenotype_label
+    FROM mpt_fragments
+    WHERE parsed.mp_id != ''
+"""
+
+# Normalized table -> query producing it, in the order they are written. Each table is
+# written to ``<table>.csv``, or with shards to ``<table>/part-NNNN.csv``.
+OUTPUTS = {
+    "genotypes": GENOTYPES_QUERY,
+    "allele_to_genotype": ALLELE_TO_GENOTYPE_QUERY,
+    "genotype_to_phenotype": GENOTYPE_TO_PHENOTYPE_QUERY,
+}
+
+# Columns identifying a row of each normalized table. Ordered outputs are sorted on them, deltas
+# match rows against the snapshot on them, and shards are assigned by a hash of the first.
+TABLE_KEYS = {
+    "genotypes": ("strain_id",),
+    "allele_to_genotype": ("strain_id", "allele_id"),
+    "genotype_to_phenotype": ("strain_id", "phenotype_id"),
+}
+
+# Columns the loaded catalog is sorted on in the store
+CATALOG_KEYS = ('"STRAIN/STOCK_ID"', "MGI_ALLELE_ACCESSION_ID")
+
+# Change kind -> query selecting those rows, given the current table and the snapshot.
+DELTA_QUERIES = {
+    "added": "SELECT * FROM {current} ANTI JOIN {previous} USING ({keys})",
+    "changed": (
+        "SELECT * FROM (SELECT * FROM {current} EXCEPT SELECT * FROM {previous}) SEMI JOIN {previous} USING ({keys})"
+    ),
+    "removed": "SELECT * FROM {previous} ANTI JOIN {current} USING ({keys})",
+}
+
+# Subdirectory of the snapshot directory holding the next snapshot until it is committed
+STAGED_SNAPSHOT_DIR = "staged"
+
+
+class CatalogSchemaError(ValueError):
+    """Raised when the catalog's header doesn't match the declared schema."""
+
+
+class CatalogRejectsError(ValueError):
+    """Raised when more catalog lines couldn't be parsed than allowed."""
+
+
+def check_catalog_header(input_file: Path) -> None:
+    """
+    Check the header of ``input_file`` against ``CATALOG_COLUMNS``, reading nothing but the first line.
+
+    Raises:
+        CatalogSchemaError: Naming the missing and unexpected columns, or the first out-of-order one
+
+    """
+    with input_file.open(newline="", encoding="utf-8-sig") as fh:
+        header = [column.strip() for column in next(csv.reader(fh), [])]
+    if header == list(CATALOG_COLUMNS):
+        return
+
+    missing = [column for column in CATALOG_COLUMNS if column not in header]
+    unexpected = [column for column in header if column not in CATALOG_COLUMNS]
+    problems = []
+    if missing:
+        problems.append(f"missing {', '.join(missing)}")
+    if unexpected:
+        problems.append(f"unexpected {', '.join(unexpected)}")
+    if not problems:
+        position = next(i for i, (column, expected) in enumerate(zip(header, CATALOG_COLUMNS)) if column != expected)
+        problems.append(f"{header[position]} in position {position + 1}, expected {CATALOG_COLUMNS[position]}")
+    raise CatalogSchemaError(
+        f"{input_file} doesn't match catalog schema version {CATALOG_SCHEMA_VERSION}: {'; '.join(problems)}"
+    )
+
+
+def load_catalog(
+    con: duckdb.DuckDBPyConnection, input_file: Path, table: str = "mmrrc", streaming: bool = False
+) -> int:
+    """
+    Load the referenced catalog columns into ``table`` in a single scan and return the row count.
+
+    The CSV is read with the declared columns and dialect, without sniffing. Lines that can't be
+    parsed are skipped, and the rejects of this scan are copied into the temporary ``catalog_rejects``
+    table (see ``check_rejects``).
+
+    With ``streaming``, ``table`` is created as a view over the CSV instead, so nothing is held in
+    memory and every query against it reads the file again. The row count is then its own pass over
+    the file, which also collects the rejected lines before any output is written. DuckDB records the
+    rejects again on every later pass, which is why only this pass's are copied.
+
+    Raises:
+        CatalogSchemaError: If the catalog's header doesn't match ``CATALOG_COLUMNS``
+
+    """
+    check_catalog_header(input_file)
+    declared = ", ".join(f"'{column}': 'VARCHAR'" for column in CATALOG_COLUMNS)
+    columns = ", ".join(
+        [f'"{column}"' for column in SOURCE_COLUMNS]
+        + [f'{expression} AS "{column}"' for column, expression in TYPED_COLUMNS.items()]
+    )
+    source = f"""
+        SELECT {columns}
+        FROM read_csv(
+            '{input_file}', columns={{{declared}}}, header=true, auto_detect=false,
+            delim=',', quote='"', escape='"', store_rejects=true,
+            rejects_table='catalog_reject_errors', rejects_scan='catalog_reject_scans'
+        )
+    """  # noqa: S608
+    relation = "VIEW" if streaming else "TABLE"
+    con.execute(f"CREATE {relation} {table} AS {source}")
+    # Fetch the whole result: the rejects are only kept once the scan's statement has finished
+    rows = con.execute(f"SELECT COUNT(*) FROM {table}").fetchall()[0][0]  # noqa: S608
+    con.execute("CREATE TEMP TABLE catalog_rejects AS SELECT * FROM catalog_reject_errors")
+    return rows
+
+
+def check_rejects(con: duckdb.DuckDBPyConnection, input_file: Path, max_rejected_lines: int = 0) -> int:
+    """
+    Print the first few catalog lines ``load_catalog`` rejected, and return the number of rejected lines.
+
+    Raises:
+        CatalogRejectsError: If more than ``max_rejected_lines`` lines were rejected
+
+    """
+    rejected = con.execute("""
+        SELECT line, FIRST(error_type ORDER BY column_idx), FIRST(error_message ORDER BY column_idx)
+        FROM catalog_rejects
+        GROUP BY line
+        ORDER BY line
+    """).fetchall()
+    for line, error_type, error_message in rejected[:5]:
+        print(f"  Rejected catalog line {line}: {error_type} ({error_message})")
+    if rejected:
+        print(f"  Rejected {len(rejected)} malformed catalog lines")
+    if len(rejected) > max_rejected_lines:
+        raise CatalogRejectsError(
+            f"{input_file} has {len(rejected)} malformed lines, more than the {max_rejected_lines} allowed"
+        )
+    return len(rejected)
+
+
+def copy_query(con: duckdb.DuckDBPyConnection, query: str, output_file: Path) -> int:
+    """Write the result of ``query`` to ``output_file`` as CSV and return the number of rows written."""
+    result = con.execute(f"COPY ({query}) TO '{output_file}' (HEADER, DELIMITER ',')").fetchone()  # noqa: S608
+    return result[0] if result else 0
+
+
+def copy_shards(
+    con: duckdb.DuckDBPyConnection, query: str, shard_key: str, shard_dir: Path, shards: int, order_by: str = ""
+) -> int:
+    """
+    Write the result of ``query`` to ``shard_dir`` as ``shards`` CSV files and return the number of rows written.
+
+    Rows are assigned to a shard by a hash of ``shard_key`` and every shard is written by its own
+    thread. Each shard file has a header, and with ``order_by`` its rows are sorted.
+    """
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    result = con.execute(f"""
+        COPY (SELECT *, hash({shard_key}) % {shards} AS _shard FROM ({query}) {order_by})
+        TO '{shard_dir}' (FORMAT CSV, HEADER, DELIMITER ',', PARTITION_BY (_shard))
+    """).fetchone()  # noqa: S608
+    # Flatten DuckDB's hive layout, _shard=N/data_0.csv, into part-NNNN.csv
+    partitions = sorted(shard_dir.glob("_shard=*"), key=lambda path: int(path.name.split("=")[1]))
+    part_files = [file for partition in partitions for file in sorted(partition.glob("*.csv"))]
+    for number, part_file in enumerate(part_files):
+        part_file.rename(shard_dir / f"part-{number:04d}.csv")
+    for partition in partitions:
+        partition.rmdir()
+    return result[0] if result else 0
+
+
+def parse_mpt_ids(con: duckdb.DuckDBPyConnection, source: str, streaming: bool = False) -> tuple[int, int]:
+    """
+    Parse the MPT_IDS lists in ``source`` into ``mpt_fragments`` and return the numbers of fragments and malformed ones.
+
+    Both counts and the printed examples come from a single pass over the fragments. With ``streaming``,
+    ``mpt_fragments`` is a view, so that pass reads ``source`` without holding the fragments in memory.
+    """
+    con.execute(MPT_FRAGMENTS_QUERY.format(source=source, relation="VIEW" if streaming else "TABLE"))
+    fragments, malformed, examples = con.execute("""
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE parsed.mp_id = ''),
+            list(fragment ORDER BY strain_id, fragment) FILTER (WHERE parsed.mp_id = '')[:5]
+        FROM mpt_fragments
+    """).fetchone()
+    for fragment in examples or []:
+        print(f"  Malformed MPT_IDS fragment: {fragment.strip()!r}")
+    return fragments, malformed
+
+
+def write_delta(con: duckdb.DuckDBPyConnection, snapshot_dir: Path, delta_dir: Path) -> dict[str, int]:
+    """
+    Diff the normalized tables against the snapshot in ``snapshot_dir``, then stage them as the next snapshot.
+
+    Added, changed and removed rows are written to ``<delta_dir>/<change>/<table>.csv`` with the same
+    columns as the full outputs, so the koza transforms can read them unchanged. A table without a
+    previous snapshot is treated as entirely added. The current tables are written to
+    ``<snapshot_dir>/staged/``, and only replace the snapshot once ``commit_snapshot`` is called.
+
+    Returns:
+        dict[str, int]: Rows written per ``<change>/<table>.csv``
+
+    """
+    staged_dir = snapshot_dir / STAGED_SNAPSHOT_DIR
+    shutil.rmtree(staged_dir, ignore_errors=True)
+    staged_dir.mkdir(parents=True)
+    counts = {}
+    for table, keys in TABLE_KEYS.items():
+        snapshot_file = snapshot_dir / f"{table}.parquet"
+        previous = f"previous_{table}"
+        if snapshot_file.exists():
+            # Cast to the current column types, so a snapshot from before a type change still compares
+            columns = ", ".join(
+                f'TRY_CAST("{name}" AS {column_type}) AS "{name}"'
+                for name, column_type, *_ in con.execute(f"DESCRIBE {table}").fetchall()
+            )
+            con.execute(f"CREATE TABLE {previous} AS SELECT {columns} FROM read_parquet('{snapshot_file}')")  # noqa: S608
+        else:
+            con.execute(f"CREATE TABLE {previous} AS SELECT * FROM {table} LIMIT 0")  # noqa: S608
+
+        for change, delta_query in DELTA_QUERIES.items():
+            (delta_dir / change).mkdir(parents=True, exist_ok=True)
+            query = delta_query.format(current=table, previous=previous, keys=", ".join(keys))
+            counts[f"{change}/{table}.csv"] = copy_query(con, query, delta_dir / change / f"{table}.csv")
+
+        con.execute(f"COPY {table} TO '{staged_dir / snapshot_file.name}' (FORMAT PARQUET)")  # noqa: S608
+    return counts
+
+
+def commit_snapshot(snapshot_dir: Path) -> bool:
+    """
+    Replace the snapshot in ``snapshot_dir`` with the one ``write_delta`` staged.
+
+    Call this only once the delta has been transformed, so a failure on the way leaves the previous
+    snapshot in place and the same delta is produced again on the next run.
+
+    Returns:
+        bool: Whether there was a staged snapshot to commit
+
+    """
+    staged_dir = snapshot_dir / STAGED_SNAPSHOT_DIR
+    if not staged_dir.is_dir():
+        return False
+    for staged_file in sorted(staged_dir.glob("*.parquet")):
+        staged_file.replace(snapshot_dir / staged_file.name)
+    shutil.rmtree(staged_dir)
+    return True
+
+
+def preprocess_mmrrc(
+    input_file: Path,
+    output_dir: Path,
+    snapshot_dir: Path | None = None,
+    streaming: bool = False,
+    memory_limit: str | None = None,
+    threads: int | None = None,
+    temp_directory: Path | None = None,
+    telemetry_file: Path | None = None,
+    shards: int | None = None,
+    ordered: bool = True,
+    store_file: Path | None = None,
+    profile_dir: Path | None = None,
+    archive_dir: Path | None = None,
+    release: str | None = None,
+    max_rejected_lines: int = 0,
+) -> dict[str, int]:
+    """
+    Preprocess MMRRC catalog data into normalized CSV files using DuckDB.
+
+    Args:
+        input_file: The MMRRC catalog CSV
+        output_dir: Directory for the normalized CSVs
+        snapshot_dir: If given, also write the changes since the snapshot in this directory to
+            ``<output_dir>/delta/`` and stage this release's tables as the next snapshot (see ``commit_snapshot``)
+        streaming: Query the CSV directly instead of loading it into memory first
+        memory_limit: DuckDB memory limit, e.g. ``"2GB"``; larger intermediates spill to disk
+        threads: Number of DuckDB worker threads
+        temp_directory: Where DuckDB spills intermediates that exceed ``memory_limit``
+        telemetry_file: Append a telemetry record for each step to this JSON lines file
+        shards: Write each table as this many hash-partitioned ``<table>/part-NNNN.csv`` files, in parallel
+        ordered: Sort each output (each shard, when sharded) on its table keys, so the output is
+            deterministic; without it, rows are written in whatever order the threads produce them
+        store_file: Also write the catalog and the normalized tables, sorted and indexed, to this DuckDB file
+        profile_dir: Write the EXPLAIN ANALYZE output and collapsed operator stacks of each step here
+        archive_dir: Append the rows added and removed since the previous archived release to the
+            historical archive in this directory (see ``catalog_archive.py``)
+        release: The release version to archive the tables under; required with ``archive_dir``
+        max_rejected_lines: How many catalog lines that can't be parsed to skip before failing
+
+    Returns:
+        dict[str, int]: Rows written per output file name (delta files under ``delta/<change>/``,
+        archived rows under ``archive/<change>/<table>``),
+        plus the loaded row count under ``"mmrrc"``, the number of catalog lines that could not be parsed
+        under ``"rejected_lines"`` and the number of MPT_IDS fragments that could not be parsed under
+        ``"malformed_mpt_ids"``
+
+    Raises:
+        CatalogSchemaError: If the catalog's header doesn't match ``CATALOG_COLUMNS``
+        CatalogRejectsError: If more than ``max_rejected_lines`` catalog lines can't be parsed
+        ValueError: If archiving without a release version, or with one that isn't an ISO date
+
+    """
+    if archive_dir is not None:
+        if release is None:
+            raise ValueError("Archiving needs the release version")
+        check_release(release)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    config: dict[str, str | int | bool] = {}
+    if memory_limit is not None:
+        config["memory_limit"] = memory_limit
+    if threads is not None:
+        config["threads"] = threads
+    if temp_directory is not None:
+        config["temp_directory"] = str(temp_directory)
+    if streaming or not ordered:
+        # No output relies on scan order: sorted outputs get theirs from an ORDER BY, and --unordered ones have
+        # none. Dropping it keeps streaming scans from buffering rows to restore that order, and lets unordered
+        # runs write rows as they come; in-memory sorted runs keep DuckDB's default.
+        config["preserve_insertion_order"] = False
+
+    print(f"{'Streaming' if streaming else 'Reading'} {input_file} into DuckDB...")
+    con = duckdb.connect(":memory:", config=config)
+    if profile_dir is not None:
+        con = QueryProfiler(con, profile_dir)
+
+    with record_stage("preprocess.load", telemetry_file) as stats, profile_queries(con, "preprocess.load"):
+        counts = {"mmrrc": load_catalog(con, input_file, streaming=streaming)}
+        stats["rows"] = counts["mmrrc"]
+    print(f"Loaded {counts['mmrrc']} rows")
+    try:
+        counts["rejected_lines"] = check_rejects(con, input_file, max_rejected_lines)
+    except CatalogRejectsError:
+        con.close()
+        raise
+
+    print("\nParsing MPT_IDS...")
+    with (
+        record_stage("preprocess.parse_mpt_ids", telemetry_file) as stats,
+        profile_queries(con, "preprocess.parse_mpt_ids"),
+    ):
+        stats["rows"], counts["malformed_mpt_ids"] = parse_mpt_ids(con, "mmrrc", streaming=streaming)
+    print(f"  Skipped {counts['malformed_mpt_ids']} malformed phenotype fragments")
+
+    for table, query in OUTPUTS.items():
+        file_name = f"{table}.csv"
+        print(f"\nCreating {table if shards else file_name}...")
+        query = query.format(source="mmrrc")
+        order_by = f"ORDER BY {', '.join(TABLE_KEYS[table])}" if ordered else ""
+        with profile_queries(con, f"preprocess.{table}"):
+            if snapshot_dir is not None or store_file is not None or archive_dir is not None:
+                # The delta, the store and the archive need the table again, so keep it rather than re-running the query
+                con.execute(f"CREATE TABLE {table} AS {query}")
+                query = f"SELECT * FROM {table}"  # noqa: S608
+            # Remove the other layout's output so transforms never read a stale copy
+            if shards:
+                (output_dir / file_name).unlink(missing_ok=True)
+                with record_stage(f"preprocess.{table}", telemetry_file) as stats:
+                    counts[file_name] = stats["rows"] = copy_shards(
+                        con, query, TABLE_KEYS[table][0], output_dir / table, shards, order_by
+                    )
+            else:
+                shutil.rmtree(output_dir / table, ignore_errors=True)
+                with record_stage(f"preprocess.{table}", telemetry_file, [output_dir / file_name]) as stats:
+                    counts[file_name] = stats["rows"] = copy_query(con, f"{query} {order_by}", output_dir / file_name)
+        print(f"  Wrote {counts[file_name]} rows")
+
+    if snapshot_dir is not None:
+        print(f"\nComparing against snapshot in {snapshot_dir}...")
+        delta_files = [
+            output_dir / "delta" / change / f"{table}.csv" for change in DELTA_QUERIES for table in TABLE_KEYS
+        ]
+        with (
+            record_stage("preprocess.delta", telemetry_file, delta_files) as stats,
+            profile_queries(con, "preprocess.delta"),
+        ):
+            delta_counts = write_delta(con, snapshot_dir, output_dir / "delta")
+            stats["rows"] = sum(delta_counts.values())
+        for name, count in delta_counts.items():
+            print(f"  {name}: {count} rows")
+        counts.update({f"delta/{name}": count for name, count in delta_counts.items()})
+
+    if store_file is not None:
+        print(f"\nWriting {store_file}...")
+        with (
+            record_stage("preprocess.store", telemetry_file, [store_file]) as stats,
+            profile_queries(con, "preprocess.store"),
+        ):
+            write_store(
+                con, {"mmrrc": CATALOG_KEYS, **TABLE_KEYS, "catalog_rejects": ("line", "column_idx")}, store_file
+            )
+            stats["rows"] = counts["mmrrc"] + sum(counts[f"{table}.csv"] for table in OUTPUTS)
+
+    if archive_dir is not None:
+        print(f"\nArchiving release {release} in {archive_dir}...")
+        with (
+            record_stage("preprocess.archive", telemetry_file) as stats,
+            profile_queries(con, "preprocess.archive"),
+        ):
+            archive_counts = archive_release(con, TABLE_KEYS, archive_dir, release)
+            stats["rows"] = sum(archive_counts.values())
+        for name, count in archive_counts.items():
+            print(f"  {name}: {count} rows")
+        counts.update({f"archive/{name}": count for name, count in archive_counts.items()})
 
     print("\nPreprocessing complete!")
     print(f"  Output directory: {output_dir}")
+    if shards:
+        print("  Sharded output: run the transforms with scripts/pipeline.py --skip-preprocess, not koza directly")
+    peak = peak_memory_bytes()
+    if peak is not None:
+        print(f"  Peak memory: {peak / 2**20:.1f} MiB")
 
     con.close()
+    return counts
 
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) != 3:
-        print("Usage: python preprocess.py <input_csv> <output_dir>")
-        sys.exit(1)
+    import argparse
 
-    input_file = Path(sys.argv[1])
-    output_dir = Path(sys.argv[2])
+    parser = argparse.ArgumentParser(description="Normalize the MMRRC catalog into processed CSVs.")
+    parser.add_argument("input_csv", type=Path)
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        help="Write a release-to-release delta against the snapshot in this directory, and stage the next snapshot",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Query the catalog CSV directly instead of loading it into memory",
+    )
+    parser.add_argument("--memory-limit", help="DuckDB memory limit, e.g. 2GB; larger intermediates spill to disk")
+    parser.add_argument("--threads", type=int, help="Number of DuckDB worker threads")
+    parser.add_argument("--temp-directory", type=Path, help="Directory DuckDB spills to above the memory limit")
+    parser.add_argument("--telemetry-file", type=Path, help="Append per-step telemetry to this JSON lines file")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Write each table as this many hash-partitioned CSVs in parallel; transform them with pipeline.py",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Skip sorting the outputs; faster, but row order may differ between runs",
+    )
+    parser.add_argument("--store", type=Path, help="Also write the tables, sorted and indexed, to this DuckDB file")
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=env_profile_dir(),
+        help="Write EXPLAIN ANALYZE output and collapsed operator stacks per step here (default: $MMRRC_PROFILE_DIR)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=Path,
+        help="Append this release's changes to the historical archive in this directory",
+    )
+    parser.add_argument(
+        "--release", help="Release version to archive under, an ISO date (default: the downloaded catalog's)"
+    )
+    parser.add_argument(
+        "--max-rejected-lines",
+        type=int,
+        default=0,
+        help="Skip up to this many malformed catalog lines instead of failing (default: 0)",
+    )
+    args = parser.parse_args()
 
-    preprocess_mmrrc(input_file, output_dir)
+    preprocess_mmrrc(
+        args.input_csv,
+        args.output_dir,
+        snapshot_dir=args.snapshot_dir,
+        streaming=args.streaming,
+        memory_limit=args.memory_limit,
+        threads=args.threads,
+        temp_directory=args.temp_directory,
+        telemetry_file=args.telemetry_file,
+        shards=args.shards,
+        ordered=not args.unordered,
+        store_file=args.store,
+        profile_dir=args.profile_dir,
+        archive_dir=args.archive_dir,
+        release=args.release or (source_version() if args.archive_dir is not None else None),
+        max_rejected_lines=args.max_rejected_lines,
+    )
@@ -0,0 +1,156 @@
+"""
+Opt-in profiling of the transforms and the preprocess queries.
+
+With a profile directory (``--profile-dir``, or the ``MMRRC_PROFILE_DIR`` environment variable) each
+koza transform runs under cProfile, and every DuckDB statement preprocessing runs is profiled by
+DuckDB itself. For each stage the directory gets:
+
+- ``<stage>.folded``: collapsed stacks, one ``frame;frame;frame microseconds`` line per stack, for
+  flamegraph.pl, inferno or speedscope. Transform stacks are Python functions; preprocess stacks are
+  the query plan operators.
+- ``<stage>.prof``: the cProfile statistics of a transform, for pstats, snakeviz or gprof2dot
+- ``<stage>.explain.txt``: the ``EXPLAIN ANALYZE`` tree of each statement a preprocess stage ran
+
+Transform call stacks are reconstructed from cProfile's caller/callee graph, dividing each function's
+time between its callers in proportion to the time each call took, as flameprof does.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+PROFILE_DIR_ENV = "MMRRC_PROFILE_DIR"
+
+# Stacks below this fraction of the total time are dropped, which bounds the size of the folded file
+MIN_FRACTION = 1e-4
+
+
+def env_profile_dir() -> Path | None:
+    """Return the profile directory set by ``MMRRC_PROFILE_DIR``, if any."""
+    value = os.environ.get(PROFILE_DIR_ENV)
+    return Path(value) if value else None
+
+
+def frame_name(func: tuple[str, int, str]) -> str:
+    """Return a folded-stack frame for a pstats function key, e.g. ``transform (genotypes.py:42)``."""
+    file_name, line, name = func
+    frame = name if file_name == "~" else f"{name} ({Path(file_name).name}:{line})"
+    return frame.replace(";", ",")
+
+
+def folded_stacks(stats: pstats.Stats, root: str) -> list[str]:
+    """Return ``stats`` as collapsed stacks under a ``root`` frame, with self time in microseconds."""
+    entries = stats.stats  # type: ignore[attr-defined]
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    total = sum(entries[func][3] for func in roots)
+    min_seconds = total * MIN_FRACTION
+    lines = []
+    pending = [(func, entries[func][3], (root,), frozenset()) for func in roots]
+    while pending:
+        func, seconds, stack, on_stack = pending.pop()
+        _, _, self_time, cumulative, _ = entries[func]
+        frames = (*stack, frame_name(func))
+        if cumulative <= 0:
+            continue
+        microseconds = round(seconds * self_time / cumulative * 1e6)
+        if microseconds > 0:
+            lines.append(f"{';'.join(frames)} {microseconds}")
+        on_stack = on_stack | {func}
+        for callee, call_seconds in callees[func]:
+            share = seconds * call_seconds / cumulative
+            # Recursive calls are already counted in the outer call's time
+            if callee not in on_stack and share >= min_seconds:
+                pending.append((callee, share, frames, on_stack))
+    return sorted(lines)
+
+
+@contextmanager
+def profile_stage(stage: str, profile_dir: Path | None) -> Iterator[None]:
+    """Run the body under cProfile and write ``<stage>.prof`` and ``<stage>.folded`` to ``profile_dir``, if given."""
+    if profile_dir is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_dir / f"{stage}.prof")
+        stats = pstats.Stats(profiler)
+        (profile_dir / f"{stage}.folded").write_text("".join(f"{line}\n" for line in folded_stacks(stats, stage)))
+
+
+def operator_stacks(node: dict[str, Any], stack: tuple[str, ...]) -> Iterator[str]:
+    """Yield collapsed stacks for a DuckDB JSON profile node and its children, with operator time in microseconds."""
+    frames = (*stack, (node.get("operator_name") or node.get("operator_type") or "?").strip())
+    microseconds = round(node.get("operator_timing", 0) * 1e6)
+    if microseconds > 0:
+        yield f"{';'.join(frames)} {microseconds}"
+    for child in node.get("children", []):
+        yield from operator_stacks(child, frames)
+
+
+class QueryProfiler:
+    """
+    A DuckDB connection that profiles every statement it executes.
+
+    Statements are attributed to the current ``stage`` (see ``profile_queries``); statements run
+    outside any stage aren't recorded.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, profile_dir: Path) -> None:
+        self.con = con
+        self.profile_dir = profile_dir
+        self.stage: str | None = None
+        self.explain: list[str] = []
+        self.folded: list[str] = []
+        con.execute("SET enable_profiling = 'no_output'")
+
+    def execute(self, query: str, *args: Any) -> duckdb.DuckDBPyConnection:
+        result = self.con.execute(query, *args)
+        if self.stage is not None:
+            self.explain.append(self.con.get_profiling_information(format="query_tree"))
+            profile = json.loads(self.con.get_profiling_information(format="json"))
+            root = (self.stage, f"statement {len(self.explain)}")
+            for child in profile.get("children", []):
+                self.folded.extend(operator_stacks(child, root))
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.con, name)
+
+    def write(self) -> None:
+        """Write the current stage's ``<stage>.explain.txt`` and ``<stage>.folded``, then clear them."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        (self.profile_dir / f"{self.stage}.explain.txt").write_text("\n".join(self.explain))
+        (self.profile_dir / f"{self.stage}.folded").write_text("".join(f"{line}\n" for line in self.folded))
+        self.explain, self.folded = [], []
+
+
+@contextmanager
+def profile_queries(con: duckdb.DuckDBPyConnection | QueryProfiler, stage: str) -> Iterator[None]:
+    """Attribute the statements ``con`` executes in the body to ``stage``, if ``con`` is a QueryProfiler."""
+    if not isinstance(con, QueryProfiler):
+        yield
+        return
+    con.stage = stage
+    try:
+        yield
+    finally:
+        con.write()
+        con.stage = None
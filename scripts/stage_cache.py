@@ -0,0 +1,100 @@
+"""
+Content-addressed cache of pipeline stage outputs.
+
+A stage's key is the SHA-256 of everything its output depends on: the contents of its input and
+code files, plus the versions of the packages that shape its output. Preprocessing is keyed on the
+catalog, every script it runs (``PREPROCESS_MODULES`` in ``pipeline.py``) and DuckDB; each transform
+on its processed input CSVs, its config, its transform code, the shared modules in ``src`` and the
+koza and Biolink model versions.
+When a stage's key is already in the cache its outputs are copied back instead of rebuilt, so
+iterating on one transform, or re-running CI on an unchanged tree, only runs what actually changed.
+"""
+
+import hashlib
+import shutil
+from collections.abc import Iterable
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import yaml
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = INGEST_DIR / "src"
+STAGE_CACHE_DIR = INGEST_DIR / "data" / "cache" / "stages"
+
+
+def package_version(package: str) -> str:
+    """Return the installed version of ``package``, or ``"missing"``."""
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "missing"
+
+
+def hash_inputs(files: Iterable[Path], packages: Iterable[str] = ()) -> str:
+    """Return the hex SHA-256 of the names and contents of ``files`` and the versions of ``packages``."""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(f"{path.name}\0".encode())
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    for package in sorted(packages):
+        digest.update(f"{package}=={package_version(package)}\0".encode())
+    return digest.hexdigest()
+
+
+def transform_code_files(name: str) -> list[Path]:
+    """
+    Return the files transform ``name``'s output depends on: its config, its transform code and the shared modules.
+
+    Modules in ``src`` that aren't any config's transform code are treated as shared, so changing
+    one invalidates every transform.
+    """
+    transform_code = {}
+    for config_file in SRC_DIR.glob("*.yaml"):
+        with config_file.open() as fh:
+            transform_code[config_file.stem] = (SRC_DIR / yaml.safe_load(fh)["transform"]["code"]).resolve()
+    shared = [path for path in SRC_DIR.glob("*.py") if path.resolve() not in transform_code.values()]
+    return [SRC_DIR / f"{name}.yaml", transform_code[name], *shared]
+
+
+class StageCache:
+    """Stores and restores stage outputs by key, and reports which stages were reused and which ran."""
+
+    def __init__(self, cache_dir: Path = STAGE_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.report: dict[str, str] = {}
+
+    def restore(self, stage: str, key: str, output_dir: Path) -> bool:
+        """Copy the cached outputs of ``stage`` for ``key`` into ``output_dir``, if there are any."""
+        entry = self.cache_dir / stage / key
+        if not entry.is_dir():
+            self.report[stage] = "ran"
+            return False
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for cached_file in entry.iterdir():
+            shutil.copy2(cached_file, output_dir / cached_file.name)
+        self.report[stage] = "reused"
+        return True
+
+    def store(self, stage: str, key: str, outputs: Iterable[Path]) -> None:
+        """Cache ``outputs`` as the result of ``stage`` for ``key``."""
+        entry = self.cache_dir / stage / key
+        if entry.is_dir():
+            return
+        # Copy into a temporary directory first so a half-written entry is never restored
+        partial = entry.with_name(f"{key}.partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+        for output in outputs:
+            if output.exists():
+                shutil.copy2(output, partial / output.name)
+        partial.rename(entry)
+
+    def print_report(self) -> None:
+        """Print whether each stage was reused from the cache or ran."""
+        print("\nStage cache:")
+        for stage, outcome in self.report.items():
+            print(f"  {stage}: {outcome}")
@@ -0,0 +1,140 @@
+"""
+Generate synthetic MMRRC catalogs for benchmarking.
+
+The generated CSV has the real catalog's header and denormalized layout: one row per strain/allele
+pair, strains without an allele on a single row with the allele columns empty, and the strain-level
+columns (including ``MPT_IDS``) repeated on every row of a strain. The proportions are chosen so
+that scale 1 is about the size of the current catalog (~69,000 genotypes, ~44,000 allele
+associations, ~46,000 phenotype associations), and a few duplicate rows and malformed phenotype
+fragments are mixed in the way they occur upstream. Output is deterministic for a given seed.
+"""
+
+import csv
+import random
+from pathlib import Path
+
+from preprocess import CATALOG_COLUMNS
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+
+# Strains in the current catalog
+BASE_STRAINS = 69_000
+
+CENTERS = ("UNC", "MU", "UCD", "JAX")
+STRAIN_TYPES = ("CON", "MSR", "SPN", "ES", "CRY")
+STATES = ("CA", "LN", "ES", "SP")
+MUTATION_TYPES = ("TM", "TG", "SM", "CH", "GT", "EM")
+CHROMOSOMES = tuple(str(n) for n in range(1, 20)) + ("X", "Y", "MT", "unknown")
+RESEARCH_AREAS = ("Endocrine Deficiency", "Digestive System Research", "Neurobiology", "Immunology", "Cancer", "")
+ANATOMY = ("bone", "vertebrae", "eye", "retina", "heart", "kidney", "liver", "lung", "brain", "skin", "tail", "ear")
+QUALITIES = ("abnormal {} morphology", "decreased {} size", "increased {} weight", "absent {}", "{} hypoplasia")
+
+# Share of strains with no allele, and with a second allele
+NO_ALLELE_RATE = 0.39
+SECOND_ALLELE_RATE = 0.05
+# Share of strains with phenotypes, and the mean length of their phenotype list
+PHENOTYPE_RATE = 0.12
+MEAN_PHENOTYPES = 5.5
+DUPLICATE_ROW_RATE = 0.002
+MALFORMED_FRAGMENT_RATE = 0.01
+
+
+def phenotype_list(rng: random.Random) -> str:
+    """Return an ``MPT_IDS`` value: a skewed-length, ``|``-separated list of ``label [MP:nnnnnnn]`` fragments."""
+    if rng.random() >= PHENOTYPE_RATE:
+        return ""
+    # Geometric lengths: most lists are short, a few run to dozens of terms
+    length = 1
+    while rng.random() > 1 / MEAN_PHENOTYPES:
+        length += 1
+    fragments = []
+    for term in rng.sample(range(1, 14_000), min(length, 13_999)):
+        label = rng.choice(QUALITIES).format(rng.choice(ANATOMY))
+        if rng.random() < MALFORMED_FRAGMENT_RATE:
+            fragments.append(f"{label} MP:{term:07d}")
+        else:
+            fragments.append(f"{label} [MP:{term:07d}]")
+    return " | ".join(fragments)
+
+
+def strain_rows(rng: random.Random, number: int) -> list[list[str]]:
+    """Return the catalog rows for synthetic strain ``number``."""
+    center = rng.choice(CENTERS)
+    gene = f"Gene{rng.randrange(1, 25_000)}"
+    strain = [
+        f"MMRRC:{number:06d}-{center}",
+        f"B6.129P2-<i>{gene}<sup>tm{number % 9 + 1}{center.title()}</sup></i>/Mm{center.lower()}",
+        f"RRID:MMRRC_{number:06d}-{center}" if rng.random() < 0.8 else "",
+        rng.choice(STRAIN_TYPES),
+        rng.choice(STATES),
+    ]
+    tail = [
+        f"https://www.mmrrc.org/catalog/sds.php?mmrrc_id={number}",
+        f"{rng.randrange(1, 13):02d}/{rng.randrange(1, 29):02d}/{rng.randrange(2000, 2026)}",
+        phenotype_list(rng),
+        f"PMID: {rng.randrange(1_000_000, 40_000_000)}" if rng.random() < 0.5 else "",
+        rng.choice(RESEARCH_AREAS),
+    ]
+
+    if rng.random() < NO_ALLELE_RATE:
+        return [strain + [""] * 8 + tail]
+    alleles = 2 if rng.random() < SECOND_ALLELE_RATE else 1
+    rows = []
+    for _ in range(alleles):
+        allele_symbol = f"{gene}<tm{rng.randrange(1, 20)}{center.title()}>"
+        allele = [
+            f"MGI:{rng.randrange(1_000_000, 7_000_000)}",
+            allele_symbol,
+            f"{gene.lower()} gene; targeted mutation, {center}",
+            rng.choice(MUTATION_TYPES),
+            rng.choice(CHROMOSOMES),
+            f"MGI:{rng.randrange(80_000, 6_000_000)}",
+            gene,
+            f"{gene.lower()} gene",
+        ]
+        rows.append(strain + allele + tail)
+    return rows
+
+
+def generate_catalog(output_file: Path, scale: float = 1, seed: int = 0) -> int:
+    """
+    Write a synthetic catalog ``scale`` times the size of the current one.
+
+    Returns:
+        int: Number of data rows written
+
+    """
+    rng = random.Random(seed)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with output_file.open("w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(CATALOG_COLUMNS)
+        for number in range(1, int(BASE_STRAINS * scale) + 1):
+            rows = strain_rows(rng, number)
+            if rng.random() < DUPLICATE_ROW_RATE:
+                rows.append(rows[0])
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+def synthetic_catalog(scale: float, seed: int = 0, data_dir: Path = INGEST_DIR / "data" / "synthetic") -> Path:
+    """Return the path of the synthetic catalog for ``scale``, generating it if it doesn't exist yet."""
+    output_file = data_dir / f"mmrrc_catalog_{scale:g}x_seed{seed}.csv"
+    if not output_file.exists():
+        generate_catalog(output_file, scale, seed)
+    return output_file
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic MMRRC catalog.")
+    parser.add_argument("output_csv", type=Path)
+    parser.add_argument("--scale", type=float, default=1, help="Size relative to the current catalog (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = generate_catalog(args.output_csv, args.scale, args.seed)
+    print(f"Wrote {rows} rows to {args.output_csv}")
@@ -0,0 +1,99 @@
+"""
+Per-stage performance telemetry for the MMRRC ingest.
+
+Each pipeline stage (the download, every preprocess query, every koza transform and the metadata
+step) can be wrapped in ``record_stage``, which measures its wall time, rows, throughput, peak
+memory and output size and appends them as one JSON line to a telemetry file, by default
+``output/telemetry.jsonl``. The file is append-only, so it also keeps the history of earlier runs;
+``write_metadata.py`` copies the latest record of each stage into ``release-metadata.yaml``.
+
+Peak memory is the peak resident set size of the process running the stage at the time the stage
+finishes, so for stages sharing a process it is an upper bound rather than that stage's own peak.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+TELEMETRY_FILE = INGEST_DIR / "output" / "telemetry.jsonl"
+
+
+def peak_memory_bytes() -> int | None:
+    """Return the peak resident set size of this process, or None where it can't be measured."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def record_stage(stage: str, telemetry_file: Path | None, outputs: Iterable[Path] = ()) -> Iterator[dict[str, Any]]:
+    """
+    Measure the ``with`` block as pipeline stage ``stage`` and append the result to ``telemetry_file``.
+
+    The block should set ``"rows"`` on the yielded record to the number of rows the stage read or
+    wrote. ``outputs`` are the files the stage writes; their total size is recorded once it finishes.
+    Nothing is recorded if the block raises, or if ``telemetry_file`` is None.
+
+    Args:
+        stage: Stage name, e.g. ``"preprocess.genotypes"`` or ``"transform.genotype"``
+        telemetry_file: JSON lines file to append the record to
+        outputs: Files written by the stage
+
+    """
+    record: dict[str, Any] = {
+        "stage": stage,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+    }
+    start = time.perf_counter()
+    yield record
+
+    wall_seconds = time.perf_counter() - start
+    rows = record.get("rows")
+    record["wall_seconds"] = round(wall_seconds, 3)
+    record["rows_per_second"] = round(rows / wall_seconds, 1) if rows is not None and wall_seconds else None
+    record["peak_rss_bytes"] = peak_memory_bytes()
+    record["output_bytes"] = sum(path.stat().st_size for path in outputs if path.exists())
+    if telemetry_file is not None:
+        write_record(telemetry_file, record)
+
+
+def write_record(telemetry_file: Path, record: dict[str, Any]) -> None:
+    """Append ``record`` to ``telemetry_file`` as a single JSON line."""
+    telemetry_file.parent.mkdir(parents=True, exist_ok=True)
+    # One short write per line in append mode, so records from parallel transform workers don't interleave
+    with telemetry_file.open("a") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def read_records(telemetry_file: Path) -> list[dict[str, Any]]:
+    """Return every record in ``telemetry_file``, oldest first, or an empty list if it doesn't exist."""
+    if not telemetry_file.exists():
+        return []
+    with telemetry_file.open() as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def latest_stages(telemetry_file: Path) -> list[dict[str, Any]]:
+    """Return the most recent record of each stage in ``telemetry_file``, in the order the stages ran."""
+    latest = {record["stage"]: record for record in read_records(telemetry_file)}
+    return sorted(latest.values(), key=lambda record: record["started_at"])
+
+
+def add_telemetry_to_metadata(metadata_file: Path, telemetry_file: Path) -> list[dict[str, Any]]:
+    """Add the latest record of each stage in ``telemetry_file`` to ``metadata_file`` under ``telemetry``."""
+    metadata = yaml.safe_load(metadata_file.read_text()) or {}
+    metadata["telemetry"] = latest_stages(telemetry_file)
+    metadata_file.write_text(yaml.safe_dump(metadata, sort_keys=False))
+    return metadata["telemetry"]
@@ -0,0 +1,60 @@
+"""
+Run the koza transforms over the release-to-release delta written by preprocess.py.
+
+``preprocess.py --snapshot-dir`` writes the added, changed and removed rows of each normalized
+table to ``data/processed/delta/<change>/``. This script points each transform config at those
+files instead of the full CSVs and writes the resulting KGX files to ``output/delta/<change>/``.
+The configured min node/edge counts describe a full release, so they are not applied to deltas.
+
+Once every transform has succeeded, the snapshot preprocess.py staged for this release is moved
+into place (``--snapshot-dir``), so the next release is diffed against this one. If a transform
+fails, the previous snapshot is kept and rerunning preprocess produces the same delta again.
+"""
+
+from pathlib import Path
+
+from pipeline import INGEST_DIR, TRANSFORMS, run_transform
+from preprocess import commit_snapshot
+
+CHANGES = ("added", "changed", "removed")
+
+
+def transform_delta(
+    delta_dir: Path, output_dir: Path, transforms: tuple[str, ...] = TRANSFORMS, snapshot_dir: Path | None = None
+) -> dict[str, int]:
+    """
+    Transform the delta CSVs for every change kind into KGX files.
+
+    With ``snapshot_dir``, the snapshot staged there by preprocess.py is committed once every
+    transform has succeeded.
+
+    Returns:
+        dict[str, int]: Rows written per ``<change>/<kgx file name>``
+
+    """
+    counts = {}
+    for change in CHANGES:
+        for name in transforms:
+            print(f"Transforming {change} {name}...")
+            transform_counts = run_transform(name, output_dir / change, delta_dir / change, check_counts=False)
+            counts.update({f"{change}/{file_name}": count for file_name, count in transform_counts.items()})
+    if snapshot_dir is not None and commit_snapshot(snapshot_dir):
+        print(f"Committed the staged snapshot in {snapshot_dir}")
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the koza transforms over a preprocess delta.")
+    parser.add_argument("delta_dir", type=Path, nargs="?", default=INGEST_DIR / "data" / "processed" / "delta")
+    parser.add_argument("output_dir", type=Path, nargs="?", default=INGEST_DIR / "output" / "delta")
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        help="Commit the snapshot preprocess.py staged in this directory once the delta is transformed",
+    )
+    args = parser.parse_args()
+
+    for name, count in transform_delta(args.delta_dir, args.output_dir, snapshot_dir=args.snapshot_dir).items():
+        print(f"  {name}: {count} rows")
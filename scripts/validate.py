@@ -0,0 +1,143 @@
+"""
+Validate the MMRRC KGX outputs with set-based DuckDB queries.
+
+The KGX TSVs are checked as whole tables, never row by row, so validation stays a few scans and
+joins however large the outputs grow, and the transforms themselves carry no per-row checks. It
+checks that:
+
+- every edge subject is a genotype node,
+- node IDs and edge subjects and objects are well-formed ``MMRRC:``, ``MGI:`` and ``MP:`` CURIEs,
+- no node or edge ID, and no subject/predicate/object triple, occurs more than once.
+
+It also reports the per-strain fan-out of each edge file (edges per subject) and, with
+``max_fan_out``, fails any strain above it. The report is written as JSON, and the run fails if
+any check found problems.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+INGEST_DIR = Path(__file__).resolve().parent.parent
+
+NODE_FILE = "mmrrc_genotype_nodes.tsv"
+STRAIN_CURIE = r"MMRRC:[0-9]+-[A-Za-z]+"
+
+# Edge file -> CURIE pattern of its objects. Every edge's subject is a strain.
+EDGE_FILES = {
+    "mmrrc_genotype_to_phenotype_edges.tsv": r"MP:[0-9]{7}",
+    "mmrrc_allele_to_genotype_edges.tsv": r"MGI:[0-9]+",
+}
+
+# Check name -> query returning one row per problem, with the offending value as ``value``.
+NODE_CHECKS = {
+    "invalid_node_id": f"SELECT id AS value FROM nodes WHERE NOT regexp_full_match(coalesce(id, ''), '{STRAIN_CURIE}')",
+    "duplicate_node_id": "SELECT id AS value FROM nodes GROUP BY id HAVING COUNT(*) > 1",
+}
+EDGE_CHECKS = {
+    "dangling_subject": "SELECT DISTINCT subject AS value FROM {edges} ANTI JOIN nodes ON {edges}.subject = nodes.id",
+    "invalid_subject_curie": (
+        f"SELECT subject AS value FROM {{edges}} WHERE NOT regexp_full_match(coalesce(subject, ''), '{STRAIN_CURIE}')"
+    ),
+    "invalid_object_curie": (
+        "SELECT object AS value FROM {edges} WHERE NOT regexp_full_match(coalesce(object, ''), '{object_pattern}')"
+    ),
+    "duplicate_edge_id": "SELECT id AS value FROM {edges} GROUP BY id HAVING COUNT(*) > 1",
+    "duplicate_edge": (
+        "SELECT subject || ' ' || predicate || ' ' || object AS value FROM {edges} "
+        "GROUP BY subject, predicate, object HAVING COUNT(*) > 1"
+    ),
+    "fan_out_above_limit": (
+        "SELECT subject || ' (' || COUNT(*) || ' edges)' AS value FROM {edges} "
+        "GROUP BY subject HAVING COUNT(*) > {max_fan_out}"
+    ),
+}
+
+FAN_OUT_QUERY = """
+    WITH fan_out AS (SELECT subject, COUNT(*) AS edges FROM {edges} GROUP BY subject)
+    SELECT
+        COUNT(*) AS subjects,
+        COALESCE(SUM(edges), 0) AS edges,
+        COALESCE(MAX(edges), 0) AS max,
+        COALESCE(ROUND(AVG(edges), 2), 0) AS mean,
+        COALESCE(quantile_disc(edges, 0.5), 0) AS median,
+        COALESCE(quantile_disc(edges, 0.99), 0) AS p99
+    FROM fan_out
+"""
+
+EXAMPLES = 5
+
+
+def read_kgx(con: duckdb.DuckDBPyConnection, table: str, kgx_file: Path, columns: tuple[str, ...]) -> None:
+    """Load ``columns`` of a KGX TSV into ``table`` in a single scan, as text exactly as written."""
+    con.execute(f"""
+        CREATE TABLE {table} AS
+        SELECT {", ".join(columns)}
+        FROM read_csv('{kgx_file}', delim='\t', header=true, all_varchar=true, quote='', escape='')
+    """)  # noqa: S608
+
+
+def run_check(con: duckdb.DuckDBPyConnection, name: str, file_name: str, query: str) -> dict[str, Any]:
+    """Run one check query, once, and summarize its failures."""
+    con.execute(f"CREATE OR REPLACE TEMP TABLE check_failures AS {query}")
+    failures = con.execute("SELECT COUNT(*) FROM check_failures").fetchone()[0]
+    examples = [row[0] for row in con.execute(f"SELECT value FROM check_failures LIMIT {EXAMPLES}").fetchall()]  # noqa: S608
+    con.execute("DROP TABLE check_failures")
+    return {"check": name, "file": file_name, "failures": failures, "examples": examples}
+
+
+def validate_kgx(output_dir: Path, max_fan_out: int | None = None) -> dict[str, Any]:
+    """
+    Validate the KGX files in ``output_dir``.
+
+    Returns:
+        dict[str, Any]: ``passed``, the result of every check under ``checks`` and per-file fan-out
+        statistics under ``fan_out``
+
+    """
+    con = duckdb.connect(":memory:")
+    read_kgx(con, "nodes", output_dir / NODE_FILE, ("id",))
+
+    checks = [run_check(con, name, NODE_FILE, query) for name, query in NODE_CHECKS.items()]
+    fan_out = {}
+    for number, (file_name, object_pattern) in enumerate(EDGE_FILES.items()):
+        if not (output_dir / file_name).exists():
+            continue
+        edges = f"edges_{number}"
+        read_kgx(con, edges, output_dir / file_name, ("id", "subject", "predicate", "object"))
+        for name, query in EDGE_CHECKS.items():
+            if name == "fan_out_above_limit" and max_fan_out is None:
+                continue
+            query = query.format(edges=edges, object_pattern=object_pattern, max_fan_out=max_fan_out)
+            checks.append(run_check(con, name, file_name, query))
+        row = con.execute(FAN_OUT_QUERY.format(edges=edges))
+        fan_out[file_name] = dict(zip([column[0] for column in row.description], row.fetchone()))
+
+    con.close()
+    return {"passed": all(check["failures"] == 0 for check in checks), "checks": checks, "fan_out": fan_out}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate the MMRRC KGX outputs.")
+    parser.add_argument("output_dir", type=Path, nargs="?", default=INGEST_DIR / "output")
+    parser.add_argument("--report", type=Path, help="Report file (default: <output_dir>/validation-report.json)")
+    parser.add_argument("--max-fan-out", type=int, help="Fail any strain with more edges than this in one file")
+    args = parser.parse_args()
+
+    report = validate_kgx(args.output_dir, max_fan_out=args.max_fan_out)
+    report_file = args.report or args.output_dir / "validation-report.json"
+    report_file.write_text(json.dumps(report, indent=2) + "\n")
+
+    for check in report["checks"]:
+        status = "ok" if check["failures"] == 0 else f"{check['failures']} failures, e.g. {check['examples']}"
+        print(f"  {check['file']} {check['check']}: {status}")
+    for file_name, stats in report["fan_out"].items():
+        print(f"  {file_name} fan-out: max {stats['max']}, mean {stats['mean']}, p99 {stats['p99']} edges per strain")
+    print(f"Wrote {report_file}")
+    if not report["passed"]:
+        sys.exit(1)
@@ -1,6 +1,9 @@
 """Emit output/release-metadata.yaml for MMRRC Ingest.
 
 Standard boilerplate — content is in src/versions.py and the schema package.
+KGX outputs are compressed and every artifact checksummed first (see finalize_artifacts.py); the
+checksums are added under ``artifact_checksums`` and the latest per-stage telemetry from
+output/telemetry.jsonl under ``telemetry``.
 """
 
 from __future__ import annotations
@@ -8,10 +11,13 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+from finalize_artifacts import add_checksums_to_metadata, finalize_artifacts
+from telemetry import TELEMETRY_FILE, add_telemetry_to_metadata, record_stage
+
 INGEST_DIR = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(INGEST_DIR / "src"))
+sys.path.insert(0, str(INGEST_DIR))
 
-from versions import get_source_versions  # noqa: E402
+from src.versions import get_source_versions  # noqa: E402
 from kozahub_metadata_schema.writer import write_metadata  # noqa: E402
 
 
@@ -20,22 +26,24 @@ if __name__ == "__main__":
     transform_paths = list(src.rglob("*.py")) + list(src.rglob("*.yaml"))
 
     output_dir = INGEST_DIR / "output"
-    # Default to globbing every TSV / NT file in output/ as artifacts.
-    # Override the artifacts list explicitly if your ingest produces a fixed set.
-    artifacts = sorted(
-        p.name
-        for p in output_dir.glob("*")
-        if p.is_file() and p.suffix in {".tsv", ".gz", ".jsonl", ".nt"}
-    )
-
-    metadata = write_metadata(
-        ingest_name="mmrrc-ingest",
-        source_versions=get_source_versions(),
-        transform_paths=transform_paths,
-        artifacts=artifacts,
-        output_dir=output_dir,
-    )
-    print(f"Wrote {output_dir / 'release-metadata.yaml'}")
+    # Every TSV / GZ / JSONL / NT file in output/, after compressing the TSVs, is an artifact.
+    with record_stage("finalize_artifacts", TELEMETRY_FILE) as stats:
+        checksums = finalize_artifacts(output_dir)
+        stats["rows"] = len(checksums)
+    artifacts = sorted(checksums)
+
+    metadata_file = output_dir / "release-metadata.yaml"
+    with record_stage("metadata", TELEMETRY_FILE, [metadata_file]):
+        metadata = write_metadata(
+            ingest_name="mmrrc-ingest",
+            source_versions=get_source_versions(),
+            transform_paths=transform_paths,
+            artifacts=artifacts,
+            output_dir=output_dir,
+        )
+    add_checksums_to_metadata(metadata_file, checksums)
+    add_telemetry_to_metadata(metadata_file, TELEMETRY_FILE)
+    print(f"Wrote {metadata_file}")
     print(f"  build_version: {metadata['build_version']}")
     for s in metadata["sources"]:
         print(
@@ -2,17 +2,66 @@
 Transform for MMRRC allele-to-genotype associations.
 
 Reads preprocessed allele_to_genotype.csv and creates GenotypeToVariantAssociation edges.
+
+Koza runs ``transform``, which builds the associations a batch of rows at a time with
+``transform_batch`` (see batches.py). ``transform_record`` is the per-row reference implementation;
+both produce the same records.
 """
 
-import uuid
+from collections.abc import Iterable
 from typing import Any
 
 import koza
 from biolink_model.datamodel.pydanticmodel_v2 import GenotypeToVariantAssociation
 from koza import KozaTransform
 
+from src.batches import transform_in_batches
+from src.edge_ids import edge_id, edge_ids
+from src.records import RecordFactory
+
+# Only id, subject (the strain) and object (the allele) vary between GenotypeToVariantAssociations.
+TEMPLATE = GenotypeToVariantAssociation(
+    id="uuid:00000000-0000-0000-0000-000000000000",
+    subject="MMRRC:000000-UNC",
+    predicate="biolink:has_sequence_variant",
+    object="MGI:0000001",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:mmrrc",
+    knowledge_level="knowledge_assertion",
+    agent_type="manual_agent",
+)
+RECORDS = RecordFactory(TEMPLATE)
+
+
+def transform_batch(rows: list[dict[str, Any]]) -> list[GenotypeToVariantAssociation]:
+    """
+    Transform a batch of allele-genotype rows into GenotypeToVariantAssociations.
+
+    Args:
+        rows: Dictionaries containing allele-genotype data from allele_to_genotype.csv
+
+    Returns:
+        list[GenotypeToVariantAssociation]: One association per row kept by ``transform_record``,
+        less any that failed validation
+
+    """
+    kept = [row for row in rows if row.get("allele_id") and row.get("strain_id")]
+    subjects = [row["strain_id"] for row in kept]
+    objects = [row["allele_id"] for row in kept]
+    ids = edge_ids(subjects, TEMPLATE.predicate, objects, TEMPLATE.primary_knowledge_source)
+
+    associations = (
+        RECORDS.build(id=id_, subject=subject, object=object_) for id_, subject, object_ in zip(ids, subjects, objects)
+    )
+    return [association for association in associations if association is not None]
+
+
+@koza.transform()
+def transform(koza_transform: KozaTransform, data: Iterable[dict[str, Any]]) -> None:
+    """Transform all rows with ``transform_batch``, see batches.py."""
+    transform_in_batches(koza_transform, data, transform_batch, RECORDS)
+
 
-@koza.transform_record()
 def transform_record(koza_transform: KozaTransform, row: dict[str, Any]) -> list[GenotypeToVariantAssociation]:
     """
     Transform an allele-genotype row into a GenotypeToVariantAssociation.
@@ -30,7 +79,7 @@ def transform_record(koza_transform: KozaTransform, row: dict[str, Any]) -> list
         return []
 
     association = GenotypeToVariantAssociation(
-        id=f"uuid:{uuid.uuid4()}",
+        id=edge_id(row["strain_id"], TEMPLATE.predicate, row["allele_id"]),
         subject=row["strain_id"],
         predicate="biolink:has_sequence_variant",
         object=row["allele_id"],
@@ -0,0 +1,56 @@
+"""
+Batched koza transform shared by the MMRRC edge transforms.
+
+Koza hands a ``@koza.transform()`` hook an iterator over every row. ``transform_in_batches`` reads
+those rows, or the store's if the config names one (see store_rows.py), in batches of ``BATCH_SIZE``
+and passes each batch to the edge module's ``transform_batch``, which computes the edge IDs for the
+whole batch at once (see edge_ids.py). Each record is still built as its own pydantic object, one per
+row, as a copy of the module's validated template (see records.py), because koza's writer takes one
+model per record and converts each in turn. The columnar path that builds no per-row objects is
+``scripts/export_kgx.py``.
+"""
+
+from collections.abc import Callable, Iterable
+from itertools import islice
+from typing import Any
+
+from koza import KozaTransform
+from pydantic import BaseModel
+
+from src.edge_ids import find_duplicate_ids
+from src.records import RecordFactory
+from src.store_rows import input_rows
+
+BATCH_SIZE = 10_000
+
+
+def transform_in_batches(
+    koza_transform: KozaTransform,
+    data: Iterable[dict[str, Any]],
+    transform_batch: Callable[[list[dict[str, Any]]], list[BaseModel]],
+    records: RecordFactory,
+) -> None:
+    """
+    Transform all rows in batches of ``BATCH_SIZE``, writing each batch to the writer at once.
+
+    Args:
+        koza_transform: Koza transform context
+        data: The rows koza reads from the config's input files, unless the config names a store
+        transform_batch: Builds the edges for a batch of rows, using ``records``
+        records: The factory ``transform_batch`` builds from; configured before and reported after the run
+
+    """
+    records.configure(koza_transform)
+    ids = []
+    rows = iter(input_rows(koza_transform, data))
+    while batch := list(islice(rows, BATCH_SIZE)):
+        edges = transform_batch(batch)
+        ids.extend(edge.id for edge in edges)
+        koza_transform.write(*edges)
+
+    duplicates = find_duplicate_ids(ids)
+    if duplicates:
+        koza_transform.log(
+            f"{len(duplicates)} edge IDs written more than once, e.g. {next(iter(duplicates))}", "WARNING"
+        )
+    records.report(koza_transform)
@@ -0,0 +1,128 @@
+"""
+Conditional, cached downloads of the MMRRC catalog.
+
+Each download is kept as a gzip-compressed copy in the cache directory, next to a JSON entry
+holding the response's ``ETag`` and ``Last-Modified`` headers, the SHA-256 of the content and the
+size and modification time of the local file. Later downloads send the headers back as
+``If-None-Match``/``If-Modified-Since``; on ``304 Not Modified`` the local file is left alone if its
+size and modification time still match the entry, and restored from the compressed copy otherwise,
+so revalidating never reads the whole file.
+The cache entry also serves as the record of the source version, so ``versions.py`` needn't make a
+request of its own.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import shutil
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+import requests
+
+CHUNK_SIZE = 1 << 20
+
+
+def cache_paths(url: str, cache_dir: Path) -> tuple[Path, Path]:
+    """Return the JSON entry and compressed copy paths for ``url`` in ``cache_dir``."""
+    name = Path(url.split("?")[0]).name or "download"
+    return cache_dir / f"{name}.json", cache_dir / f"{name}.gz"
+
+
+def read_entry(url: str, cache_dir: Path) -> dict[str, Any] | None:
+    """Return the cache entry for ``url``, or None if it has never been downloaded into ``cache_dir``."""
+    entry_file, _ = cache_paths(url, cache_dir)
+    if not entry_file.exists():
+        return None
+    return json.loads(entry_file.read_text())
+
+
+def last_modified_version(last_modified: str) -> str:
+    """Return an HTTP ``Last-Modified`` header value as an ISO date, e.g. ``2024-01-31``."""
+    return parsedate_to_datetime(last_modified).date().isoformat()
+
+
+def local_file_current(local_file: Path, entry: dict[str, Any]) -> bool:
+    """Return whether ``local_file`` is still the copy ``entry`` recorded, judged by its size and modification time."""
+    if not local_file.exists():
+        return False
+    stat = local_file.stat()
+    return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+
+def fetch(
+    url: str, local_file: Path, cache_dir: Path, session: requests.Session | None = None, timeout: float = 300
+) -> dict[str, Any]:
+    """
+    Download ``url`` to ``local_file`` unless the cached copy is still current.
+
+    Args:
+        url: Source URL
+        local_file: Where the uncompressed file should be
+        cache_dir: Directory for the cache entry and compressed copy
+        session: HTTP session to use, e.g. one with retries configured
+        timeout: Seconds to wait for the server
+
+    Returns:
+        dict[str, Any]: The cache entry, with ``changed`` set to whether new content was downloaded
+
+    Raises:
+        requests.HTTPError: If the server responds with an error status
+
+    """
+    session = session or requests.Session()
+    entry_file, compressed_file = cache_paths(url, cache_dir)
+    entry = read_entry(url, cache_dir) if compressed_file.exists() else None
+
+    headers = {}
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if entry is not None and response.status_code == 304:
+            if not local_file_current(local_file, entry):
+                local_file.parent.mkdir(parents=True, exist_ok=True)
+                with gzip.open(compressed_file, "rb") as src, local_file.open("wb") as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                entry["mtime_ns"] = local_file.stat().st_mtime_ns
+            entry["checked_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            entry_file.write_text(json.dumps(entry, indent=2) + "\n")
+            return {**entry, "changed": False}
+
+        response.raise_for_status()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write both copies under temporary names so an interrupted download never looks current
+        partial_file = local_file.with_name(f"{local_file.name}.partial")
+        partial_compressed = compressed_file.with_name(f"{compressed_file.name}.partial")
+        digest = hashlib.sha256()
+        size = 0
+        with partial_file.open("wb") as plain, gzip.open(partial_compressed, "wb") as compressed:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                plain.write(chunk)
+                compressed.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        partial_file.replace(local_file)
+        partial_compressed.replace(compressed_file)
+
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest.hexdigest(),
+            "size": size,
+            "mtime_ns": local_file.stat().st_mtime_ns,
+            "retrieved_at": now,
+            "checked_at": now,
+        }
+    entry_file.write_text(json.dumps(entry, indent=2) + "\n")
+    return {**entry, "changed": True}
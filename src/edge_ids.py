@@ -0,0 +1,66 @@
+"""
+Deterministic, content-addressed IDs for MMRRC edges.
+
+An edge ID is the name-based (version 5) UUID of its predicate, primary knowledge source, subject and
+object, so identical edges get identical IDs in every build and can be diffed, deduplicated and cached.
+The same IDs can be computed in Python, one at a time or per batch, or in DuckDB with ``EDGE_ID_MACRO``.
+"""
+
+import hashlib
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+
+# uuid5(NAMESPACE_URL, "https://github.com/monarch-initiative/mmrrc-ingest"), fixed so IDs never change
+NAMESPACE = uuid.UUID("bba67bf3-d3ac-545c-afb2-0e85476e46ff")
+
+# The namespace as a DuckDB BLOB literal body, e.g. \xBB\xA6...
+_NAMESPACE_BLOB = "".join(f"\\x{byte:02X}" for byte in NAMESPACE.bytes)
+
+# DuckDB macro computing ``edge_id`` in SQL: the SHA-1 of namespace and name, with the UUID version
+# nibble set to 5 and the variant bits to 10xx, formatted as a hyphenated ``uuid:`` string.
+EDGE_ID_MACRO = f"""
+    CREATE OR REPLACE MACRO edge_id_sha1(name) AS
+        sha1('{_NAMESPACE_BLOB}'::BLOB || encode(name));
+    CREATE OR REPLACE MACRO edge_id_format(h) AS
+        'uuid:' || h[1:8] || '-' || h[9:12] || '-5' || h[14:16] || '-'
+        || substr('89ab', ((strpos('0123456789abcdef', h[17]) - 1) % 4) + 1, 1) || h[18:20] || '-' || h[21:32];
+    CREATE OR REPLACE MACRO edge_id(subject, predicate, object, source) AS
+        edge_id_format(edge_id_sha1(predicate || '|' || source || '|' || subject || '|' || object));
+"""
+
+
+def edge_id(subject: str, predicate: str, object_: str, source: str = "infores:mmrrc") -> str:
+    """Return the ID for a single edge, ``uuid:`` followed by the uuid5 of its content."""
+    return f"uuid:{uuid.uuid5(NAMESPACE, f'{predicate}|{source}|{subject}|{object_}')}"
+
+
+def edge_ids(subjects: list[str], predicate: str, objects: list[str], source: str = "infores:mmrrc") -> list[str]:
+    """
+    Return the IDs for a batch of edges sharing a predicate and source.
+
+    Equivalent to calling ``edge_id`` for each subject/object pair, but the namespace, predicate and
+    source are hashed once and the partially-fed SHA-1 is copied for every edge.
+
+    Args:
+        subjects: Edge subjects
+        predicate: The predicate shared by every edge in the batch
+        objects: Edge objects, in the same order as ``subjects``
+        source: The primary knowledge source shared by every edge in the batch
+
+    Returns:
+        list[str]: One ID per subject/object pair
+
+    """
+    prefix = hashlib.sha1(NAMESPACE.bytes + f"{predicate}|{source}|".encode(), usedforsecurity=False)
+    ids = []
+    for subject, object_ in zip(subjects, objects):
+        digest = prefix.copy()
+        digest.update(f"{subject}|{object_}".encode())
+        ids.append(f"uuid:{uuid.UUID(bytes=digest.digest()[:16], version=5)}")
+    return ids
+
+
+def find_duplicate_ids(ids: Iterable[str]) -> dict[str, int]:
+    """Return each ID that occurs more than once, mapped to its number of occurrences."""
+    return {id_: count for id_, count in Counter(ids).items() if count > 1}
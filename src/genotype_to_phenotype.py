@@ -2,17 +2,73 @@
 Transform for MMRRC genotype-to-phenotype associations.
 
 Reads preprocessed genotype_to_phenotype.csv and creates GenotypeToPhenotypicFeatureAssociation edges.
+
+Koza runs ``transform``, which builds the associations a batch of rows at a time with
+``transform_batch`` (see batches.py). ``transform_record`` is the per-row reference implementation;
+both produce the same records.
 """
 
-import uuid
+from collections.abc import Iterable
 from typing import Any
 
 import koza
 from biolink_model.datamodel.pydanticmodel_v2 import GenotypeToPhenotypicFeatureAssociation
 from koza import KozaTransform
 
+from src.batches import transform_in_batches
+from src.edge_ids import edge_id, edge_ids
+from src.records import RecordFactory
+
+# Only id, subject (the strain) and object (the phenotype) vary between GenotypeToPhenotypicFeatureAssociations.
+TEMPLATE = GenotypeToPhenotypicFeatureAssociation(
+    id="uuid:00000000-0000-0000-0000-000000000000",
+    subject="MMRRC:000000-UNC",
+    predicate="biolink:has_phenotype",
+    object="MP:0000001",
+    aggregator_knowledge_source=["infores:monarchinitiative"],
+    primary_knowledge_source="infores:mmrrc",
+    knowledge_level="knowledge_assertion",
+    agent_type="manual_agent",
+)
+RECORDS = RecordFactory(TEMPLATE)
+
+
+def transform_batch(rows: list[dict[str, Any]]) -> list[GenotypeToPhenotypicFeatureAssociation]:
+    """
+    Transform a batch of genotype-phenotype rows into GenotypeToPhenotypicFeatureAssociations.
+
+    Args:
+        rows: Dictionaries containing genotype-phenotype data from genotype_to_phenotype.csv
+
+    Returns:
+        list[GenotypeToPhenotypicFeatureAssociation]: One association per row kept by ``transform_record``,
+        less any that failed validation
+
+    """
+    kept = [
+        row
+        for row in rows
+        if row.get("strain_id")
+        and row.get("phenotype_id")
+        and row.get("phenotype_label")
+        and row["phenotype_label"].strip() != ""
+    ]
+    subjects = [row["strain_id"] for row in kept]
+    objects = [row["phenotype_id"] for row in kept]
+    ids = edge_ids(subjects, TEMPLATE.predicate, objects, TEMPLATE.primary_knowledge_source)
+
+    associations = (
+        RECORDS.build(id=id_, subject=subject, object=object_) for id_, subject, object_ in zip(ids, subjects, objects)
+    )
+    return [association for association in associations if association is not None]
+
+
+@koza.transform()
+def transform(koza_transform: KozaTransform, data: Iterable[dict[str, Any]]) -> None:
+    """Transform all rows with ``transform_batch``, see batches.py."""
+    transform_in_batches(koza_transform, data, transform_batch, RECORDS)
+
 
-@koza.transform_record()
 def transform_record(
     koza_transform: KozaTransform, row: dict[str, Any]
 ) -> list[GenotypeToPhenotypicFeatureAssociation]:
@@ -36,7 +92,7 @@ def transform_record(
         return []
 
     association = GenotypeToPhenotypicFeatureAssociation(
-        id=f"uuid:{uuid.uuid4()}",
+        id=edge_id(row["strain_id"], TEMPLATE.predicate, row["phenotype_id"]),
         subject=row["strain_id"],
         predicate="biolink:has_phenotype",
         object=row["phenotype_id"],
@@ -2,16 +2,42 @@
 Transform for MMRRC genotype nodes.
 
 Reads preprocessed genotypes.csv and creates Genotype nodes.
+
+Koza runs ``transform``, which passes each row, read from the catalog store if the config names one
+(see store_rows.py), to ``transform_record``. Each node is a copy of a single validated template with
+its ID, name and xref filled in, validated as configured by the ``validation`` option (see records.py).
 """
 
+from collections.abc import Iterable
 from typing import Any
 
 import koza
 from biolink_model.datamodel.pydanticmodel_v2 import Genotype
 from koza import KozaTransform
 
+from src.records import RecordFactory
+from src.store_rows import input_rows
+
+# Every genotype differs only in id, name and xref; everything else is validated once here.
+TEMPLATE = Genotype(
+    id="MMRRC:000000-UNC",
+    name="template",
+    in_taxon=["NCBITaxon:10090"],  # All MMRRC strains are Mus musculus
+    in_taxon_label="Mus musculus",
+    provided_by=["infores:mmrrc"],
+)
+RECORDS = RecordFactory(TEMPLATE)
+
+
+@koza.transform()
+def transform(koza_transform: KozaTransform, data: Iterable[dict[str, Any]]) -> None:
+    """Transform every row with ``transform_record``, then report any genotypes that failed validation."""
+    RECORDS.configure(koza_transform)
+    for row in input_rows(koza_transform, data):
+        koza_transform.write(*transform_record(koza_transform, row))
+    RECORDS.report(koza_transform)
+
 
-@koza.transform_record()
 def transform_record(koza_transform: KozaTransform, row: dict[str, Any]) -> list[Genotype]:
     """
     Transform a genotype row into a Genotype node.
@@ -21,20 +47,17 @@ def transform_record(koza_transform: KozaTransform, row: dict[str, Any]) -> list
         row: Dictionary containing genotype data from genotypes.csv
 
     Returns:
-        list[Genotype]: A list containing a biolink Genotype node
+        list[Genotype]: A list containing a biolink Genotype node, or nothing if it failed validation
 
     """
     # Skip rows without a strain ID
     if not row.get("strain_id"):
         return []
 
-    genotype = Genotype(
+    genotype = RECORDS.build(
         id=row["strain_id"],  # Already in format MMRRC:XXXXXX-XXX
         name=row["strain_designation"],
         xref=[row["other_names"]] if row.get("other_names") else None,
-        in_taxon=["NCBITaxon:10090"],  # All MMRRC strains are Mus musculus
-        in_taxon_label="Mus musculus",
-        provided_by=["infores:mmrrc"],
     )
 
-    return [genotype]
+    return [genotype] if genotype is not None else []
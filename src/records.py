@@ -0,0 +1,92 @@
+"""
+Fast construction of Biolink records from validated templates.
+
+The transforms build hundreds of thousands of records per release that differ only in a few fields
+(an ID and name, or a subject and object). A ``RecordFactory`` validates the constant fields once, in
+a template, and builds each record as a copy of it with just those fields replaced, without
+running pydantic validation. The copy is shallow, except that the template's list, dict and set fields
+(e.g. ``in_taxon`` and ``provided_by``) are copied, so mutating one record never changes the others.
+How many of the built records are still validated is set by the ``validation`` option under
+``transform`` in the koza config:
+
+- ``always`` (the default): every record, exactly as constructing the model directly would
+- an integer ``N``: the first record and every Nth one after it
+- ``off``: none
+
+A record that fails validation is skipped rather than written. Failures are counted, and the
+number and first few examples are logged when the transform finishes.
+"""
+
+from copy import copy
+from typing import Any, Generic, TypeVar
+
+from koza import KozaTransform
+from pydantic import BaseModel, ValidationError
+
+DEFAULT_VALIDATION = "always"
+EXAMPLES = 5
+
+Record = TypeVar("Record", bound=BaseModel)
+
+
+def validation_interval(validation: str | int | None) -> int:
+    """
+    Return how often records are validated for a ``validation`` setting: 1 for every record, 0 for never.
+
+    Raises:
+        ValueError: If ``validation`` is not ``always``, ``off`` or a positive integer
+
+    """
+    validation = DEFAULT_VALIDATION if validation is None else str(validation)
+    if validation == "always":
+        return 1
+    if validation == "off":
+        return 0
+    if not validation.isdigit() or int(validation) < 1:
+        raise ValueError(f"validation must be 'always', 'off' or a positive integer, not {validation!r}")
+    return int(validation)
+
+
+class RecordFactory(Generic[Record]):
+    """Builds records of one class as copies of a validated template, validating a configurable sample."""
+
+    def __init__(self, template: Record, validation: str | int | None = None) -> None:
+        self.template = template
+        self.model = type(template)
+        self.constants = {name: getattr(template, name) for name in template.model_fields_set}
+        self.containers = [name for name, value in self.constants.items() if isinstance(value, (list, dict, set))]
+        self.interval = validation_interval(validation)
+        self.built = 0
+        self.failures = 0
+        self.examples: list[str] = []
+
+    def configure(self, koza_transform: KozaTransform) -> None:
+        """Apply the config's ``validation`` setting and reset the counts for a new run."""
+        self.interval = validation_interval(koza_transform.extra_fields.get("validation"))
+        self.built = self.failures = 0
+        self.examples = []
+
+    def build(self, **fields: Any) -> Record | None:
+        """Return the template with ``fields`` replaced, or None if it was validated and failed."""
+        validate = self.interval and self.built % self.interval == 0
+        self.built += 1
+        if not validate:
+            containers = {name: copy(self.constants[name]) for name in self.containers if name not in fields}
+            return self.template.model_copy(update={**containers, **fields})
+        try:
+            return self.model.model_validate({**self.constants, **fields})
+        except ValidationError as e:
+            self.failures += 1
+            if len(self.examples) < EXAMPLES:
+                error = e.errors()[0]
+                self.examples.append(f"{fields}: {'.'.join(map(str, error['loc']))} {error['msg']}")
+            return None
+
+    def report(self, koza_transform: KozaTransform) -> None:
+        """Log the number of records that failed validation, with examples, if there were any."""
+        if self.failures:
+            koza_transform.log(
+                f"{self.failures} {self.model.__name__} records failed validation and were skipped, "
+                f"e.g. {'; '.join(self.examples)}",
+                "WARNING",
+            )
@@ -0,0 +1,59 @@
+"""
+Rows for the koza transforms from the DuckDB catalog store, in place of the processed CSVs.
+
+``pipeline.py --store`` sets ``store`` under ``transform`` in each koza config to where
+``preprocess.py --store`` wrote the store, e.g.::
+
+    store:
+      file: data/processed/mmrrc.duckdb
+      tables: [genotype_to_phenotype]
+      shard: [0, 8]    # optional: only the rows with hash(strain_id) % 8 = 0
+      row_limit: 0     # optional: 0 for all rows
+
+The transforms' ``@koza.transform()`` hooks then take their rows from ``input_rows``, which reads
+``tables`` from the store rather than iterating over the rows koza parses from the config's CSVs.
+koza only opens its input files once those rows are iterated, so the CSVs aren't read at all. Rows
+are yielded in stored order, exactly as koza's CSV reader yields them from the processed CSVs, so the
+KGX output is the same.
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any
+
+import duckdb
+from koza import KozaTransform
+
+
+def iter_rows(
+    store_file: Path, table: str, batch_size: int = 10_000, shard: tuple[int, int] | None = None
+) -> Iterator[dict[str, str]]:
+    """
+    Yield the rows of ``table`` in stored order, as koza's CSV reader would yield them from the processed CSV.
+
+    Values are strings stripped of surrounding whitespace, with NULL as ``""``. With ``shard``
+    ``(k, n)``, only the rows whose ``strain_id`` hashes to ``k`` modulo ``n`` are yielded.
+    """
+    query = f"SELECT * FROM {table}"  # noqa: S608
+    if shard is not None:
+        query += f" WHERE hash(strain_id) % {int(shard[1])} = {int(shard[0])}"
+    con = duckdb.connect(str(store_file), read_only=True)
+    try:
+        result = con.execute(query)
+        columns = [column[0] for column in result.description]
+        while batch := result.fetchmany(batch_size):
+            for row in batch:
+                yield {column: "" if value is None else str(value).strip() for column, value in zip(columns, row)}
+    finally:
+        con.close()
+
+
+def input_rows(koza_transform: KozaTransform, data: Iterable[dict[str, Any]]) -> Iterable[dict[str, Any]]:
+    """Return the rows from the store the config's ``store`` option names, or koza's ``data`` if it names none."""
+    store = koza_transform.extra_fields.get("store")
+    if not store:
+        return data
+    shard = tuple(store["shard"]) if store.get("shard") else None
+    rows = chain.from_iterable(iter_rows(Path(store["file"]), table, shard=shard) for table in store["tables"])
+    return islice(rows, store.get("row_limit") or None)
@@ -1,6 +1,8 @@
 """Upstream source version fetcher for mmrrc-ingest.
 
-MMRRC catalog has no in-band versioning; use HTTP Last-Modified.
+MMRRC catalog has no in-band versioning; use HTTP Last-Modified. The header recorded by the
+last download (see download_cache.py) is reused, and the server is only asked directly when the
+catalog hasn't been downloaded through the cache.
 """
 
 from __future__ import annotations
@@ -14,14 +16,21 @@ from kozahub_metadata_schema import (
     version_from_http_last_modified,
 )
 
+from src.download_cache import last_modified_version, read_entry
+
 
 INGEST_DIR = Path(__file__).resolve().parents[1]
 DOWNLOAD_YAML = INGEST_DIR / "download.yaml"
+CACHE_DIR = INGEST_DIR / "data" / "cache"
 
 
 def get_source_versions() -> list[dict[str, Any]]:
     urls = urls_from_download_yaml(DOWNLOAD_YAML)
-    ver, method = version_from_http_last_modified(urls[0]) if urls else ("unknown", "unavailable")
+    entry = read_entry(urls[0], CACHE_DIR) if urls else None
+    if entry is not None and entry.get("last_modified"):
+        ver, method = last_modified_version(entry["last_modified"]), "http_last_modified"
+    else:
+        ver, method = version_from_http_last_modified(urls[0]) if urls else ("unknown", "unavailable")
     return [
         {
             "id": "infores:mmrrc",
@@ -29,6 +38,6 @@ def get_source_versions() -> list[dict[str, Any]]:
             "urls": urls,
             "version": ver,
             "version_method": method,
-            "retrieved_at": now_iso(),
+            "retrieved_at": entry["retrieved_at"] if entry is not None else now_iso(),
         }
     ]
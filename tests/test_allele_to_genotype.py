@@ -9,7 +9,7 @@ from biolink_model.datamodel.pydanticmodel_v2 import GenotypeToVariantAssociatio
 from koza import KozaTransform
 from koza.io.writer.passthrough_writer import PassthroughWriter
 
-from allele_to_genotype import transform_record
+from src.allele_to_genotype import transform_batch, transform_record
 
 
 @pytest.fixture
@@ -65,7 +65,7 @@ def test_association_agent_type(allele_genotype_association: GenotypeToVariantAs
 
 
 def test_association_has_id(allele_genotype_association: GenotypeToVariantAssociation) -> None:
-    """Test association has a generated ID"""
+    """Test association has a generated content-addressed ID"""
     assert allele_genotype_association.id is not None
     assert allele_genotype_association.id.startswith("uuid:")
 
@@ -73,3 +73,21 @@ def test_association_has_id(allele_genotype_association: GenotypeToVariantAssoci
 def test_association_category(allele_genotype_association: GenotypeToVariantAssociation) -> None:
     """Test association has correct biolink category"""
     assert "biolink:GenotypeToVariantAssociation" in allele_genotype_association.category
+
+
+def test_batch_matches_per_row(allele_genotype_row: dict[str, str]) -> None:
+    """Test the batched transform produces the same records as the per-row transform"""
+    rows = [
+        allele_genotype_row,
+        {"allele_id": "MGI:1857912", "strain_id": "MMRRC:000003-UNC"},
+        {"allele_id": "", "strain_id": "MMRRC:000004-MU"},
+    ]
+    koza_transform = KozaTransform(mappings={}, writer=PassthroughWriter(), extra_fields={})
+    per_row = [edge for row in rows for edge in transform_record(koza_transform, row)]
+    batched = transform_batch(rows)
+
+    def dump(edges: list[GenotypeToVariantAssociation]) -> list[dict]:
+        return [edge.model_dump(mode="json", exclude_none=True) for edge in edges]
+
+    assert len(batched) == 2
+    assert dump(batched) == dump(per_row)
@@ -0,0 +1,79 @@
+"""
+Test file for the synthetic catalog generator and the benchmark suite.
+"""
+
+import csv
+from pathlib import Path
+
+from benchmark import check_startup, find_regressions, measure_startup, run_benchmarks
+from preprocess import preprocess_mmrrc
+from synthetic_catalog import BASE_STRAINS, CATALOG_COLUMNS, generate_catalog
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_synthetic_catalog_layout(tmp_path: Path) -> None:
+    """Test a synthetic catalog has the real header and normalizes into the expected genotypes"""
+    catalog = tmp_path / "catalog.csv"
+    rows = generate_catalog(catalog, scale=0.01, seed=1)
+
+    with catalog.open() as fh, SAMPLE_CATALOG.open() as sample:
+        header = next(csv.reader(fh))
+        assert header == list(CATALOG_COLUMNS) == next(csv.reader(sample))
+
+    counts = preprocess_mmrrc(catalog, tmp_path / "processed")
+    assert counts["mmrrc"] == rows
+    assert counts["genotypes.csv"] == int(BASE_STRAINS * 0.01)
+    assert counts["allele_to_genotype.csv"] > 0
+    assert counts["genotype_to_phenotype.csv"] > 0
+
+
+def test_synthetic_catalog_deterministic(tmp_path: Path) -> None:
+    """Test the same seed generates the same catalog"""
+    generate_catalog(tmp_path / "a.csv", scale=0.005, seed=7)
+    generate_catalog(tmp_path / "b.csv", scale=0.005, seed=7)
+    assert (tmp_path / "a.csv").read_bytes() == (tmp_path / "b.csv").read_bytes()
+
+
+def test_run_benchmarks(tmp_path: Path) -> None:
+    """Test each stage reports its rows, timing and throughput"""
+    results = run_benchmarks((0.002,), ("preprocess", "genotype"), work_dir=tmp_path)
+
+    preprocess = results["0.002x"]["preprocess"]
+    genotype = results["0.002x"]["genotype"]
+    assert preprocess["rows"] > 0
+    assert genotype["rows"] == int(BASE_STRAINS * 0.002)
+    assert genotype["wall_seconds"] > 0
+    assert genotype["rows_per_second"] > 0
+
+
+def test_find_regressions() -> None:
+    """Test throughput drops and memory growth beyond the tolerance are flagged"""
+    baseline = {"1x": {"preprocess": {"rows_per_second": 1000.0, "peak_rss_bytes": 100 * 2**20}}}
+
+    within = {"1x": {"preprocess": {"rows_per_second": 900.0, "peak_rss_bytes": 110 * 2**20}}}
+    assert find_regressions(within, baseline, tolerance=0.2) == []
+
+    slower = {"1x": {"preprocess": {"rows_per_second": 700.0, "peak_rss_bytes": 150 * 2**20}}}
+    assert len(find_regressions(slower, baseline, tolerance=0.2)) == 2
+
+    unknown = {"10x": {"preprocess": {"rows_per_second": 1.0, "peak_rss_bytes": 1}}}
+    assert find_regressions(unknown, baseline) == []
+
+
+def test_startup_imports_without_koza(tmp_path: Path) -> None:
+    """Test the parent-process modules import without koza; the time budgets are checked by benchmark --startup"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "processed")
+    startup = measure_startup(tmp_path / "processed", tmp_path / "output", ("genotype",))
+
+    assert startup["heavy_modules"] == []
+
+
+def test_check_startup_reports_overruns() -> None:
+    """Test heavy imports and slow startup are reported against the budgets"""
+    startup = {"import_seconds": 9.0, "heavy_modules": ["koza"], "first_record_seconds": {"genotype": 99.0}}
+    assert check_startup(startup) == [
+        "importing pipeline, preprocess, export_kgx, validate, catalog_store, transform_delta loaded koza",
+        "imports took 9.00s, budget 2.00s",
+        "genotype first record took 99.00s, budget 20.00s",
+    ]
@@ -0,0 +1,88 @@
+"""
+Test file for the historical archive of catalog releases.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from catalog_archive import history, releases
+from preprocess import preprocess_mmrrc
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def next_release(tmp_path: Path) -> Path:
+    """Write a second release of the sample: 000004 withdrawn, 000002 loses a phenotype"""
+    lines = SAMPLE_CATALOG.read_text().splitlines(keepends=True)
+    release = [line for line in lines if not line.startswith("MMRRC:000004-MU")]
+    release = [line.replace(" | abnormal vertebrae morphology [MP:0000137]", "") for line in release]
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("".join(release))
+    return catalog
+
+
+@pytest.fixture
+def archive_dir(tmp_path: Path) -> Path:
+    """Archive two releases of the sample catalog"""
+    archive_dir = tmp_path / "archive"
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "first", archive_dir=archive_dir, release="2024-01-31")
+    preprocess_mmrrc(next_release(tmp_path), tmp_path / "second", archive_dir=archive_dir, release="2024-02-29")
+    return archive_dir
+
+
+def test_only_changes_archived(tmp_path: Path) -> None:
+    """Test a release stores only the rows added and removed since the previous one"""
+    archive_dir = tmp_path / "archive"
+    first = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "first", archive_dir=archive_dir, release="2024-01-31")
+    assert first["archive/added/genotypes"] == 5
+    assert first["archive/removed/genotypes"] == 0
+
+    unchanged = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "first", archive_dir=archive_dir, release="2024-02-29")
+    assert not any(count for name, count in unchanged.items() if name.startswith("archive/"))
+
+    second = preprocess_mmrrc(
+        next_release(tmp_path), tmp_path / "second", archive_dir=archive_dir, release="2024-03-31"
+    )
+    # 000002's phenotype list changed, so its genotype row is replaced as well as 000004's removed
+    assert second["archive/removed/genotypes"] == 2
+    assert second["archive/added/genotypes"] == 1
+    assert second["archive/removed/genotype_to_phenotype"] == 1
+    assert second["archive/added/genotype_to_phenotype"] == 0
+    assert releases(archive_dir) == ["2024-01-31", "2024-02-29", "2024-03-31"]
+
+
+def test_strain_history(archive_dir: Path) -> None:
+    """Test a strain's history shows when each of its phenotype annotations was added and removed"""
+    phenotypes = [
+        (change["release"], change["change"], change["phenotype_id"])
+        for change in history(archive_dir, "strain", "MMRRC:000002-UNC")
+        if change["table"] == "genotype_to_phenotype"
+    ]
+    assert phenotypes == [
+        ("2024-01-31", "added", "MP:0000063"),
+        ("2024-01-31", "added", "MP:0000137"),
+        ("2024-02-29", "removed", "MP:0000137"),
+    ]
+    assert [(change["release"], change["change"]) for change in history(archive_dir, "allele", "MGI:1857899")] == [
+        ("2024-01-31", "added")
+    ]
+    assert history(archive_dir, "strain", "MMRRC:999999-XX") == []
+
+
+def test_rearchive_latest_release(tmp_path: Path, archive_dir: Path) -> None:
+    """Test archiving the latest release again replaces it, and an older release is refused"""
+    again = preprocess_mmrrc(next_release(tmp_path), tmp_path / "again", archive_dir=archive_dir, release="2024-02-29")
+    assert again["archive/removed/genotypes"] == 2
+    assert len(history(archive_dir, "strain", "MMRRC:000004-MU")) == 2
+
+    with pytest.raises(ValueError, match="older than the latest archived release"):
+        preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "old", archive_dir=archive_dir, release="2023-12-31")
+
+
+@pytest.mark.parametrize("release", ["2024.10", "2024-1-31", "20240131", "unknown"])
+def test_release_must_be_iso_date(tmp_path: Path, release: str) -> None:
+    """Test a release version that wouldn't sort by date is refused before anything is written"""
+    with pytest.raises(ValueError, match="isn't an ISO date"):
+        preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "processed", archive_dir=tmp_path / "archive", release=release)
+    assert not (tmp_path / "processed" / "genotypes.csv").exists()
@@ -0,0 +1,84 @@
+"""
+Test file for the indexed DuckDB catalog store.
+"""
+
+import csv
+from pathlib import Path
+
+import pytest
+
+from catalog_store import connect, lookup
+from pipeline import TRANSFORMS, run_pipeline, run_transform
+from preprocess import OUTPUTS, preprocess_mmrrc
+from src.store_rows import iter_rows
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+@pytest.fixture
+def store_file(tmp_path: Path) -> Path:
+    """Preprocess the sample catalog with a store into a temporary directory"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path, store_file=tmp_path / "mmrrc.duckdb")
+    return tmp_path / "mmrrc.duckdb"
+
+
+def test_store_tables_and_indexes(store_file: Path) -> None:
+    """Test the catalog and every normalized table are stored and indexed on their IDs"""
+    con = connect(store_file)
+    tables = {row[0] for row in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+    catalog_rows = con.execute("SELECT COUNT(*) FROM mmrrc").fetchone()[0]
+    indexes = {row[0] for row in con.execute("SELECT index_name FROM duckdb_indexes()").fetchall()}
+    con.close()
+
+    assert tables == {"mmrrc", "catalog_rejects", *OUTPUTS}
+    assert catalog_rows == 7
+    assert {
+        "genotypes_strain_id_idx",
+        "allele_to_genotype_allele_id_idx",
+        "genotype_to_phenotype_phenotype_id_idx",
+    } <= indexes
+
+
+def test_lookups(store_file: Path) -> None:
+    """Test point lookups by strain, allele and phenotype"""
+    con = connect(store_file)
+
+    assert [row["allele_id"] for row in lookup(con, "strain_alleles", "MMRRC:000003-UNC")] == [
+        "MGI:1857899",
+        "MGI:1857912",
+    ]
+    assert lookup(con, "allele_strains", "MGI:2152217") == [{"strain_id": "MMRRC:000002-UNC"}]
+    assert lookup(con, "phenotype_strains", "MP:0000063") == [{"strain_id": "MMRRC:000002-UNC"}]
+    assert {row["phenotype_id"] for row in lookup(con, "strain_phenotypes", "MMRRC:000005-UCD")} == {"MP:0001406"}
+    assert lookup(con, "strain", "MMRRC:999999-XX") == []
+    con.close()
+
+
+def test_iter_rows_match_csv_reader(store_file: Path) -> None:
+    """Test store rows are exactly what koza's CSV reader yields from the processed CSVs"""
+    for table in OUTPUTS:
+        with (store_file.parent / f"{table}.csv").open(newline="") as fh:
+            csv_rows = [{key: value.strip() for key, value in row.items()} for row in csv.DictReader(fh)]
+        assert list(iter_rows(store_file, table, batch_size=2)) == csv_rows
+
+
+def test_pipeline_store_output_identical(tmp_path: Path) -> None:
+    """Test transforms reading the store write the same KGX files as transforms reading the CSVs"""
+    from_csv = run_pipeline(SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "csv", check_counts=False)
+    from_store = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "store", check_counts=False, store=True
+    )
+
+    assert (tmp_path / "processed" / "mmrrc.duckdb").exists()
+    assert from_store == from_csv
+    for kgx_file in (tmp_path / "csv").glob("*.tsv"):
+        assert (tmp_path / "store" / kgx_file.name).read_bytes() == kgx_file.read_bytes()
+
+
+def test_transforms_read_store_not_csvs(store_file: Path, tmp_path: Path) -> None:
+    """Test transforms given the store never open the processed CSVs"""
+    for table in OUTPUTS:
+        (store_file.parent / f"{table}.csv").unlink()
+    for name in TRANSFORMS:
+        counts = run_transform(name, tmp_path / "output", store_file.parent, check_counts=False, store_file=store_file)
+        assert sum(counts.values()) == 5
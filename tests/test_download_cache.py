@@ -0,0 +1,139 @@
+"""
+Test file for conditional, cached downloads, against a local HTTP server standing in for MMRRC.
+"""
+
+import gzip
+import threading
+from collections.abc import Iterator
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from pipeline import run_pipeline
+from src.download_cache import cache_paths, fetch, last_modified_version, read_entry
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """Serves ``server.content`` with an ETag and Last-Modified, honouring conditional requests."""
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.statuses.append(None)
+        etag = f'"{hash(self.server.content)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.statuses[-1] = 304
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.server.statuses[-1] = 200
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(self.server.modified, usegmt=True))
+        self.send_header("Content-Length", str(len(self.server.content)))
+        self.end_headers()
+        self.wfile.write(self.server.content)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[ThreadingHTTPServer]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+    httpd.content = SAMPLE_CATALOG.read_bytes()
+    httpd.modified = 1_700_000_000
+    httpd.statuses = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/mmrrc_catalog_data.csv"
+
+
+def test_first_download(server: ThreadingHTTPServer, tmp_path: Path) -> None:
+    """Test a first download writes the file, a compressed copy and the response's validators"""
+    local_file = tmp_path / "data" / "catalog.csv"
+    entry = fetch(url(server), local_file, tmp_path / "cache")
+
+    assert entry["changed"] is True
+    assert local_file.read_bytes() == SAMPLE_CATALOG.read_bytes()
+    _, compressed_file = cache_paths(url(server), tmp_path / "cache")
+    assert gzip.decompress(compressed_file.read_bytes()) == SAMPLE_CATALOG.read_bytes()
+    assert read_entry(url(server), tmp_path / "cache")["etag"] == entry["etag"]
+    assert last_modified_version(entry["last_modified"]) == "2023-11-14"
+
+
+def test_unchanged_download(server: ThreadingHTTPServer, tmp_path: Path) -> None:
+    """Test an unchanged source is revalidated with a 304 and restored from the compressed copy"""
+    local_file = tmp_path / "catalog.csv"
+    fetch(url(server), local_file, tmp_path / "cache")
+    local_file.unlink()
+
+    entry = fetch(url(server), local_file, tmp_path / "cache")
+
+    assert entry["changed"] is False
+    assert server.statuses == [200, 304]
+    assert local_file.read_bytes() == SAMPLE_CATALOG.read_bytes()
+
+
+def test_unchanged_download_left_alone(server: ThreadingHTTPServer, tmp_path: Path) -> None:
+    """Test a 304 leaves a local file matching the entry's size and mtime untouched, and restores an edited one"""
+    local_file = tmp_path / "catalog.csv"
+    fetch(url(server), local_file, tmp_path / "cache")
+    mtime = local_file.stat().st_mtime_ns
+
+    assert fetch(url(server), local_file, tmp_path / "cache")["changed"] is False
+    assert local_file.stat().st_mtime_ns == mtime
+    local_file.write_text("edited\n")
+    assert fetch(url(server), local_file, tmp_path / "cache")["changed"] is False
+    assert local_file.read_bytes() == SAMPLE_CATALOG.read_bytes()
+
+
+def test_changed_download(server: ThreadingHTTPServer, tmp_path: Path) -> None:
+    """Test new upstream content is downloaded again"""
+    local_file = tmp_path / "catalog.csv"
+    fetch(url(server), local_file, tmp_path / "cache")
+    server.content += b"MMRRC:000006-MU,STOCK Pax6<Sey>/Mmmh,,SPN,CA,,,,,,,,,,01/15/2002,,,\n"
+
+    entry = fetch(url(server), local_file, tmp_path / "cache")
+
+    assert entry["changed"] is True
+    assert server.statuses == [200, 200]
+    assert local_file.read_bytes() == server.content
+
+
+def test_pipeline_skips_unchanged_catalog(tmp_path: Path) -> None:
+    """Test the pipeline short-circuits when the catalog matches the one the output was built from"""
+    args = (SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output")
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is not None
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is None
+
+
+def test_pipeline_rebuilds_after_code_change(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test an unchanged catalog is still rebuilt when a transform's code or config has changed"""
+    import pipeline
+
+    code_file = tmp_path / "transform.py"
+    code_file.write_text("# version 1\n")
+    transform_code_files = pipeline.transform_code_files
+    monkeypatch.setattr(pipeline, "transform_code_files", lambda name: [*transform_code_files(name), code_file])
+
+    args = (SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output")
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is not None
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is None
+    code_file.write_text("# version 2\n")
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is not None
+
+
+def test_pipeline_rebuilds_with_other_validation(tmp_path: Path) -> None:
+    """Test an unchanged catalog is still rebuilt when the records are validated differently"""
+    args = (SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output")
+    assert run_pipeline(*args, check_counts=False, if_changed=True) is not None
+    assert run_pipeline(*args, check_counts=False, if_changed=True, validation="1000") is not None
+    assert run_pipeline(*args, check_counts=False, if_changed=True, validation="1000") is None
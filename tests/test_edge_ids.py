@@ -0,0 +1,36 @@
+"""
+Test file for deterministic edge ID generation.
+"""
+
+from src.edge_ids import edge_id, edge_ids, find_duplicate_ids
+
+
+def test_edge_id_is_stable() -> None:
+    """Test the same edge content always gets the same ID"""
+    first = edge_id("MMRRC:000002-UNC", "biolink:has_phenotype", "MP:0000063")
+    assert first == edge_id("MMRRC:000002-UNC", "biolink:has_phenotype", "MP:0000063")
+    assert first.startswith("uuid:")
+
+
+def test_edge_id_depends_on_content() -> None:
+    """Test changing any of subject, predicate, object or source changes the ID"""
+    base = edge_id("MMRRC:000002-UNC", "biolink:has_phenotype", "MP:0000063")
+    assert base != edge_id("MMRRC:000003-UNC", "biolink:has_phenotype", "MP:0000063")
+    assert base != edge_id("MMRRC:000002-UNC", "biolink:has_sequence_variant", "MP:0000063")
+    assert base != edge_id("MMRRC:000002-UNC", "biolink:has_phenotype", "MP:0000137")
+    assert base != edge_id("MMRRC:000002-UNC", "biolink:has_phenotype", "MP:0000063", source="infores:mgi")
+
+
+def test_edge_ids_matches_edge_id() -> None:
+    """Test the bulk hasher agrees with the single-edge ID"""
+    subjects = ["MMRRC:000002-UNC", "MMRRC:000002-UNC", "MMRRC:000003-UNC"]
+    objects = ["MP:0000063", "MP:0000137", "MP:0001557"]
+    assert edge_ids(subjects, "biolink:has_phenotype", objects) == [
+        edge_id(subject, "biolink:has_phenotype", object_) for subject, object_ in zip(subjects, objects)
+    ]
+
+
+def test_find_duplicate_ids() -> None:
+    """Test only repeated IDs are reported, with their counts"""
+    assert find_duplicate_ids(["uuid:a", "uuid:b", "uuid:a", "uuid:c", "uuid:a"]) == {"uuid:a": 3}
+    assert find_duplicate_ids([]) == {}
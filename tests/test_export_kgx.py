@@ -0,0 +1,49 @@
+"""
+Test file for the direct DuckDB-to-KGX export.
+
+The koza transforms are the reference: the SQL export must write byte-identical KGX files.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from export_kgx import export_kgx
+from pipeline import run_pipeline
+from preprocess import CatalogRejectsError
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_export_matches_koza_transforms(tmp_path: Path) -> None:
+    """Test every exported KGX file is identical to the one written by the koza transform"""
+    # Add a strain whose fields need koza's whitespace stripping and tab/newline sanitizing
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text(
+        SAMPLE_CATALOG.read_text()
+        + 'MMRRC:000006-MU," STOCK\tPax6<Sey>/Mmmh ",  RRID:MMRRC_000006-MU  ,SPN,CA,MGI:1856155,Pax6<Sey>,'
+        + '"paired box 6;\nsmall eye",SM,2,,,,,01/15/2002,'
+        + '"microphthalmia [MP:0001297]\t| iris hypoplasia [MP:0001301]",,\n'
+    )
+    run_pipeline(catalog, tmp_path / "processed", tmp_path / "koza", check_counts=False)
+    counts = export_kgx(catalog, tmp_path / "sql")
+
+    assert set(counts) == {
+        "mmrrc_genotype_nodes.tsv",
+        "mmrrc_genotype_to_phenotype_edges.tsv",
+        "mmrrc_allele_to_genotype_edges.tsv",
+    }
+    for file_name in counts:
+        assert (tmp_path / "sql" / file_name).read_text() == (tmp_path / "koza" / file_name).read_text()
+
+
+def test_export_rejects_malformed_lines(tmp_path: Path) -> None:
+    """Test the export fails on lines that can't be parsed, like preprocessing, unless they are allowed"""
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text(SAMPLE_CATALOG.read_text() + "MMRRC:999999-UNC,truncated,line\n")
+    with pytest.raises(CatalogRejectsError, match="1 malformed lines"):
+        export_kgx(catalog, tmp_path / "sql")
+    assert not (tmp_path / "sql").exists()
+
+    counts = export_kgx(catalog, tmp_path / "sql", max_rejected_lines=1)
+    assert counts["mmrrc_genotype_nodes.tsv"] == 5
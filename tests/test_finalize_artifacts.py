@@ -0,0 +1,68 @@
+"""
+Test file for artifact compression and checksumming.
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+
+from finalize_artifacts import HASH_CACHE_FILE, finalize_artifacts
+
+
+def write_artifacts(output_dir: Path) -> None:
+    output_dir.mkdir()
+    (output_dir / "mmrrc_genotype_nodes.tsv").write_text("id\tcategory\n" + "MMRRC:1\tbiolink:Genotype\n" * 1000)
+    (output_dir / "mmrrc_allele_to_genotype_edges.tsv").write_text("id\tsubject\n")
+    (output_dir / "extra.jsonl").write_text('{"a": 1}\n')
+    (output_dir / "telemetry.jsonl").write_text('{"stage": "x"}\n')
+
+
+def test_finalize_artifacts(tmp_path: Path) -> None:
+    """Test every TSV is compressed and every artifact gets the checksum of its bytes"""
+    output_dir = tmp_path / "output"
+    write_artifacts(output_dir)
+
+    artifacts = finalize_artifacts(output_dir, workers=2)
+
+    assert set(artifacts) == {
+        "extra.jsonl",
+        "mmrrc_allele_to_genotype_edges.tsv",
+        "mmrrc_allele_to_genotype_edges.tsv.gz",
+        "mmrrc_genotype_nodes.tsv",
+        "mmrrc_genotype_nodes.tsv.gz",
+    }
+    nodes = output_dir / "mmrrc_genotype_nodes.tsv"
+    assert gzip.decompress((output_dir / "mmrrc_genotype_nodes.tsv.gz").read_bytes()) == nodes.read_bytes()
+    for name, artifact in artifacts.items():
+        content = (output_dir / name).read_bytes()
+        assert artifact["sha256"] == hashlib.sha256(content).hexdigest()
+        assert artifact["size"] == len(content)
+
+
+def test_unchanged_artifacts_not_reread(tmp_path: Path) -> None:
+    """Test cached artifacts are reused, and changed ones are recompressed"""
+    output_dir = tmp_path / "output"
+    write_artifacts(output_dir)
+    first = finalize_artifacts(output_dir)
+    assert (output_dir / HASH_CACHE_FILE).exists()
+
+    gz = output_dir / "mmrrc_genotype_nodes.tsv.gz"
+    gz_mtime = gz.stat().st_mtime_ns
+    edges = output_dir / "mmrrc_allele_to_genotype_edges.tsv"
+    edges.write_text("id\tsubject\nuuid:1\tMMRRC:1\n")
+
+    second = finalize_artifacts(output_dir)
+
+    assert gz.stat().st_mtime_ns == gz_mtime
+    assert second["mmrrc_genotype_nodes.tsv.gz"] == first["mmrrc_genotype_nodes.tsv.gz"]
+    assert second[edges.name]["sha256"] == hashlib.sha256(edges.read_bytes()).hexdigest()
+    assert gzip.decompress((output_dir / f"{edges.name}.gz").read_bytes()) == edges.read_bytes()
+
+
+def test_compression_is_deterministic(tmp_path: Path) -> None:
+    """Test the same TSV always compresses to the same bytes"""
+    for run in ("a", "b"):
+        write_artifacts(tmp_path / run)
+        finalize_artifacts(tmp_path / run)
+    name = "mmrrc_genotype_nodes.tsv.gz"
+    assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
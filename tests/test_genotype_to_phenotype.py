@@ -9,7 +9,7 @@ from biolink_model.datamodel.pydanticmodel_v2 import GenotypeToPhenotypicFeature
 from koza import KozaTransform
 from koza.io.writer.passthrough_writer import PassthroughWriter
 
-from genotype_to_phenotype import transform_record
+from src.genotype_to_phenotype import transform_batch, transform_record
 
 
 @pytest.fixture
@@ -62,7 +62,7 @@ def test_association_agent_type(genotype_phenotype_association: GenotypeToPhenot
 
 
 def test_association_has_id(genotype_phenotype_association: GenotypeToPhenotypicFeatureAssociation) -> None:
-    """Test association has a generated ID"""
+    """Test association has a generated content-addressed ID"""
     assert genotype_phenotype_association.id is not None
     assert genotype_phenotype_association.id.startswith("uuid:")
 
@@ -70,3 +70,22 @@ def test_association_has_id(genotype_phenotype_association: GenotypeToPhenotypic
 def test_association_category(genotype_phenotype_association: GenotypeToPhenotypicFeatureAssociation) -> None:
     """Test association has correct biolink category"""
     assert "biolink:GenotypeToPhenotypicFeatureAssociation" in genotype_phenotype_association.category
+
+
+def test_batch_matches_per_row(genotype_phenotype_row: dict[str, str]) -> None:
+    """Test the batched transform produces the same records as the per-row transform"""
+    rows = [
+        genotype_phenotype_row,
+        {"strain_id": "MMRRC:000003-UNC", "phenotype_id": "MP:0001557", "phenotype_label": "intestinal obstruction"},
+        {"strain_id": "MMRRC:000003-UNC", "phenotype_id": "MP:0009999", "phenotype_label": " "},
+        {"strain_id": "", "phenotype_id": "MP:0000137", "phenotype_label": "abnormal vertebrae morphology"},
+    ]
+    koza_transform = KozaTransform(mappings={}, writer=PassthroughWriter(), extra_fields={})
+    per_row = [edge for row in rows for edge in transform_record(koza_transform, row)]
+    batched = transform_batch(rows)
+
+    def dump(edges: list[GenotypeToPhenotypicFeatureAssociation]) -> list[dict]:
+        return [edge.model_dump(mode="json", exclude_none=True) for edge in edges]
+
+    assert len(batched) == 2
+    assert dump(batched) == dump(per_row)
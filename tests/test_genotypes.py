@@ -9,7 +9,7 @@ from biolink_model.datamodel.pydanticmodel_v2 import Genotype
 from koza import KozaTransform
 from koza.io.writer.passthrough_writer import PassthroughWriter
 
-from genotypes import transform_record
+from src.genotypes import transform_record
 
 
 @pytest.fixture
@@ -0,0 +1,79 @@
+"""
+Test file for the parallel pipeline runner.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from pipeline import MinCountError, run_pipeline, run_transforms
+from preprocess import preprocess_mmrrc
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_pipeline_counts(tmp_path: Path) -> None:
+    """Test preprocess plus all three transforms report per-transform counts"""
+    results = run_pipeline(SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", check_counts=False)
+
+    assert results == {
+        "genotype": {"mmrrc_genotype_nodes.tsv": 5},
+        "genotype_to_phenotype": {"mmrrc_genotype_to_phenotype_edges.tsv": 5},
+        "allele_to_genotype": {"mmrrc_allele_to_genotype_edges.tsv": 5},
+    }
+
+
+def test_pipeline_fails_below_min_count(tmp_path: Path) -> None:
+    """Test a transform below its configured minimum fails the run"""
+    with pytest.raises(MinCountError, match="below the configured min_"):
+        run_pipeline(SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output")
+
+
+def test_pipeline_reads_shards(tmp_path: Path) -> None:
+    """Test the transforms read sharded preprocess output"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "processed", shards=2)
+    results = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", preprocess=False, check_counts=False
+    )
+
+    assert results["genotype"] == {"mmrrc_genotype_nodes.tsv": 5}
+    assert results["genotype_to_phenotype"] == {"mmrrc_genotype_to_phenotype_edges.tsv": 5}
+    assert results["allele_to_genotype"] == {"mmrrc_allele_to_genotype_edges.tsv": 5}
+
+
+@pytest.mark.parametrize("store", [False, True])
+def test_sharded_transforms_match_unsharded(tmp_path: Path, store: bool) -> None:
+    """Test running each transform as shards writes the same KGX files as running it whole"""
+    unsharded = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "unsharded", check_counts=False, store=store
+    )
+    sharded = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "sharded", check_counts=False, store=store, shards=3
+    )
+
+    assert sharded == unsharded
+    for kgx_file in (tmp_path / "unsharded").glob("*.tsv"):
+        assert (tmp_path / "sharded" / kgx_file.name).read_bytes() == kgx_file.read_bytes()
+    assert not (tmp_path / "sharded" / ".shards").exists()
+
+
+def test_sharded_transforms_sort_unordered_inputs(tmp_path: Path) -> None:
+    """Test sharded transforms over inputs out of key order still match an unsharded run over sorted inputs"""
+    unsharded = run_pipeline(SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "unsharded", check_counts=False)
+    (tmp_path / "reversed").mkdir()
+    for csv_file in (tmp_path / "processed").glob("*.csv"):
+        header, *rows = csv_file.read_text().splitlines(keepends=True)
+        (tmp_path / "reversed" / csv_file.name).write_text("".join([header, *reversed(rows)]))
+    sharded = run_transforms(tmp_path / "sharded", tmp_path / "reversed", check_counts=False, shards=2)
+
+    assert sharded == unsharded
+    for kgx_file in (tmp_path / "unsharded").glob("*.tsv"):
+        assert (tmp_path / "sharded" / kgx_file.name).read_bytes() == kgx_file.read_bytes()
+
+
+def test_sharded_min_count_checks_merged_totals(tmp_path: Path) -> None:
+    """Test the minimum counts are checked against the merged shards, not each shard"""
+    with pytest.raises(MinCountError, match="wrote 5 edges"):
+        run_pipeline(
+            SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", transforms=("allele_to_genotype",), shards=3
+        )
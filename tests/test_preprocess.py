@@ -0,0 +1,223 @@
+"""
+Test file for MMRRC catalog preprocessing.
+
+Tests normalization of a small sample of the MMRRC catalog into the three processed CSVs.
+"""
+
+import csv
+import datetime
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from preprocess import CatalogRejectsError, CatalogSchemaError, commit_snapshot, preprocess_mmrrc
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def read_rows(path: Path) -> list[dict[str, str]]:
+    with path.open(newline="") as fh:
+        return list(csv.DictReader(fh))
+
+
+@pytest.fixture
+def processed_dir(tmp_path: Path) -> Path:
+    """Preprocess the sample catalog into a temporary directory"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path)
+    return tmp_path
+
+
+def test_genotypes_deduplicated(processed_dir: Path) -> None:
+    """Test one genotype row is written per strain"""
+    strain_ids = [row["strain_id"] for row in read_rows(processed_dir / "genotypes.csv")]
+    assert strain_ids == [
+        "MMRRC:000001-UNC",
+        "MMRRC:000002-UNC",
+        "MMRRC:000003-UNC",
+        "MMRRC:000004-MU",
+        "MMRRC:000005-UCD",
+    ]
+
+
+def test_allele_to_genotype_pairs(processed_dir: Path) -> None:
+    """Test allele rows are distinct and rows without an allele accession are dropped"""
+    pairs = [(row["strain_id"], row["allele_id"]) for row in read_rows(processed_dir / "allele_to_genotype.csv")]
+    assert pairs == [
+        ("MMRRC:000001-UNC", "MGI:3696864"),
+        ("MMRRC:000002-UNC", "MGI:2152217"),
+        ("MMRRC:000003-UNC", "MGI:1857899"),
+        ("MMRRC:000003-UNC", "MGI:1857912"),
+        ("MMRRC:000005-UCD", "MGI:1856000"),
+    ]
+
+
+def test_genotype_to_phenotype_labels(processed_dir: Path) -> None:
+    """Test MPT_IDS is exploded into one row per MP term with its label"""
+    rows = read_rows(processed_dir / "genotype_to_phenotype.csv")
+    assert [(row["strain_id"], row["phenotype_id"]) for row in rows] == [
+        ("MMRRC:000002-UNC", "MP:0000063"),
+        ("MMRRC:000002-UNC", "MP:0000137"),
+        ("MMRRC:000003-UNC", "MP:0001557"),
+        ("MMRRC:000003-UNC", "MP:0002277"),
+        ("MMRRC:000003-UNC", "MP:0009999"),
+        ("MMRRC:000005-UCD", "MP:0001406"),
+    ]
+    assert rows[0]["phenotype_label"].strip() == "decreased bone mineral density"
+    assert rows[4]["phenotype_label"].strip() == ""
+
+
+def test_malformed_mpt_ids_counted(tmp_path: Path) -> None:
+    """Test MPT_IDS fragments without a bracketed MP ID are counted, and empty fragments ignored"""
+    counts = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path)
+    assert counts["malformed_mpt_ids"] == 1
+
+
+def test_counts_match_outputs(tmp_path: Path) -> None:
+    """Test the returned counts come from the COPY results and match the written files"""
+    counts = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path)
+    assert counts["mmrrc"] == 7
+    assert counts["rejected_lines"] == 0
+    for file_name in ("genotypes.csv", "allele_to_genotype.csv", "genotype_to_phenotype.csv"):
+        assert counts[file_name] == len(read_rows(tmp_path / file_name))
+
+
+def test_accepted_date_kept_as_text(tmp_path: Path) -> None:
+    """Test ACCEPTED_DATE is written as the catalog's text, and parsed into a separate date column in the store"""
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text(SAMPLE_CATALOG.read_text().replace("05/01/2001", "2001-05-01").replace("01/15/2002", "1/5/2002"))
+    store_file = tmp_path / "mmrrc.duckdb"
+    preprocess_mmrrc(catalog, tmp_path / "processed", store_file=store_file)
+
+    dates = {row["strain_id"]: row["accepted_date"] for row in read_rows(tmp_path / "processed" / "genotypes.csv")}
+    assert dates["MMRRC:000001-UNC"] == "2001-05-01"
+    assert dates["MMRRC:000004-MU"] == "1/5/2002"
+    con = duckdb.connect(str(store_file), read_only=True)
+    parsed = dict(con.execute('SELECT DISTINCT "STRAIN/STOCK_ID", ACCEPTED_DATE_PARSED FROM mmrrc').fetchall())
+    con.close()
+    assert parsed["MMRRC:000001-UNC"] is None
+    assert parsed["MMRRC:000004-MU"] == datetime.date(2002, 1, 5)
+
+
+def test_header_drift_fails(tmp_path: Path) -> None:
+    """Test a catalog whose header doesn't match the declared schema fails before loading, naming the column"""
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text(SAMPLE_CATALOG.read_text().replace("MPT_IDS", "MP_TERM_IDS", 1))
+    with pytest.raises(CatalogSchemaError, match="missing MPT_IDS; unexpected MP_TERM_IDS"):
+        preprocess_mmrrc(catalog, tmp_path / "processed")
+    assert not (tmp_path / "processed" / "genotypes.csv").exists()
+
+
+def test_malformed_lines_rejected(tmp_path: Path) -> None:
+    """Test a line with the wrong number of columns fails preprocessing, unless it is allowed and skipped"""
+    lines = SAMPLE_CATALOG.read_text().splitlines(keepends=True)
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("".join([*lines, "MMRRC:999999-UNC,truncated\n"]))
+    with pytest.raises(CatalogRejectsError, match="1 malformed lines"):
+        preprocess_mmrrc(catalog, tmp_path / "processed")
+    assert not (tmp_path / "processed" / "genotypes.csv").exists()
+
+    counts = preprocess_mmrrc(catalog, tmp_path / "processed", max_rejected_lines=1)
+    assert counts["mmrrc"] == 7
+    assert counts["rejected_lines"] == 1
+
+
+def test_streaming_store_rejects_recorded_once(tmp_path: Path) -> None:
+    """Test the store keeps each rejected line's errors once, however many times streaming reads the CSV"""
+    lines = SAMPLE_CATALOG.read_text().splitlines(keepends=True)
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("".join([*lines, "MMRRC:999999-UNC,truncated\n"]))
+
+    rejects = []
+    for streaming in (False, True):
+        store_file = tmp_path / f"streaming-{streaming}.duckdb"
+        preprocess_mmrrc(
+            catalog,
+            tmp_path / f"streaming-{streaming}",
+            store_file=store_file,
+            max_rejected_lines=1,
+            streaming=streaming,
+        )
+        con = duckdb.connect(str(store_file), read_only=True)
+        rejects.append(con.execute("SELECT line, column_idx FROM catalog_rejects ORDER BY ALL").fetchall())
+        con.close()
+    assert rejects[0]
+    assert rejects[1] == rejects[0]
+
+
+def test_delta_against_snapshot(tmp_path: Path) -> None:
+    """Test a second release is diffed per strain against the snapshot of the first"""
+    snapshot_dir = tmp_path / "snapshot"
+    first = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "first", snapshot_dir=snapshot_dir)
+    assert first["delta/added/genotypes.csv"] == 5
+    assert first["delta/removed/genotypes.csv"] == 0
+    assert commit_snapshot(snapshot_dir)
+
+    # Next release: strain 000004 is withdrawn, 000001 is renamed, 000002 loses a phenotype
+    lines = SAMPLE_CATALOG.read_text().splitlines(keepends=True)
+    release = [line for line in lines if not line.startswith("MMRRC:000004-MU")]
+    release = [line.replace("C57BL/6-Tg", "C57BL/6J-Tg") for line in release]
+    release = [line.replace(" | abnormal vertebrae morphology [MP:0000137]", "") for line in release]
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("".join(release))
+
+    second_dir = tmp_path / "second"
+    second = preprocess_mmrrc(catalog, second_dir, snapshot_dir=snapshot_dir)
+    delta_dir = second_dir / "delta"
+    assert [row["strain_id"] for row in read_rows(delta_dir / "removed" / "genotypes.csv")] == ["MMRRC:000004-MU"]
+    assert [row["strain_id"] for row in read_rows(delta_dir / "changed" / "genotypes.csv")] == [
+        "MMRRC:000001-UNC",
+        "MMRRC:000002-UNC",
+    ]
+    assert [row["phenotype_id"] for row in read_rows(delta_dir / "removed" / "genotype_to_phenotype.csv")] == [
+        "MP:0000137"
+    ]
+    assert second["delta/added/genotypes.csv"] == 0
+    assert second["delta/added/allele_to_genotype.csv"] == 0
+    assert second["delta/changed/allele_to_genotype.csv"] == 0
+
+
+def test_streaming_matches_in_memory(tmp_path: Path, processed_dir: Path) -> None:
+    """Test streaming the CSV under a memory cap produces the same outputs as loading it"""
+    streamed_dir = tmp_path / "streamed"
+    counts = preprocess_mmrrc(
+        SAMPLE_CATALOG,
+        streamed_dir,
+        streaming=True,
+        memory_limit="256MB",
+        threads=2,
+        temp_directory=tmp_path / "spill",
+    )
+    assert counts["mmrrc"] == 7
+    assert counts["malformed_mpt_ids"] == 1
+    for file_name in ("genotypes.csv", "allele_to_genotype.csv", "genotype_to_phenotype.csv"):
+        assert (streamed_dir / file_name).read_text() == (processed_dir / file_name).read_text()
+
+
+def test_sharded_output(tmp_path: Path) -> None:
+    """Test sharded output holds the same rows as the single files, split by strain and sorted per shard"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "single")
+    counts = preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "sharded", shards=3)
+
+    for table in ("genotypes", "allele_to_genotype", "genotype_to_phenotype"):
+        shard_files = sorted((tmp_path / "sharded" / table).glob("part-*.csv"))
+        assert shard_files
+        shard_rows = [read_rows(shard_file) for shard_file in shard_files]
+        strains = [{row["strain_id"] for row in rows} for rows in shard_rows]
+        assert all(not a & b for i, a in enumerate(strains) for b in strains[i + 1 :])
+        assert all(rows == sorted(rows, key=lambda row: row["strain_id"]) for rows in shard_rows)
+
+        single_rows = read_rows(tmp_path / "single" / f"{table}.csv")
+        assert sorted(map(str, sum(shard_rows, []))) == sorted(map(str, single_rows))
+        assert counts[f"{table}.csv"] == len(single_rows)
+
+
+def test_unordered_output(tmp_path: Path) -> None:
+    """Test unordered output holds the same rows as ordered output"""
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "ordered")
+    preprocess_mmrrc(SAMPLE_CATALOG, tmp_path / "unordered", ordered=False)
+
+    for table in ("genotypes", "allele_to_genotype", "genotype_to_phenotype"):
+        ordered = read_rows(tmp_path / "ordered" / f"{table}.csv")
+        unordered = read_rows(tmp_path / "unordered" / f"{table}.csv")
+        assert sorted(map(str, unordered)) == sorted(map(str, ordered))
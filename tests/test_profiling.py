@@ -0,0 +1,62 @@
+"""
+Test file for the transform and preprocess profiling hooks.
+"""
+
+import pstats
+import re
+from pathlib import Path
+
+from pipeline import run_pipeline
+from profiling import profile_stage
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+FOLDED_LINE = re.compile(r"^[^;\n]+(;[^;\n]+)* [0-9]+$")
+
+
+def busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def outer() -> int:
+    return busy(200_000) + busy(100_000)
+
+
+def test_profile_stage_writes_folded_stacks(tmp_path: Path) -> None:
+    """Test a profiled block is written as pstats and as collapsed stacks rooted at the stage"""
+    with profile_stage("example", tmp_path):
+        outer()
+
+    assert pstats.Stats(str(tmp_path / "example.prof")).total_calls > 0
+    lines = (tmp_path / "example.folded").read_text().splitlines()
+    assert lines
+    assert all(FOLDED_LINE.match(line) and line.startswith("example;") for line in lines)
+    assert any(re.search(r";outer \(test_profiling\.py:\d+\);busy \(test_profiling\.py:\d+\)", line) for line in lines)
+
+
+def test_profile_stage_disabled(tmp_path: Path) -> None:
+    """Test nothing is written without a profile directory"""
+    with profile_stage("example", None):
+        outer()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pipeline_profiles(tmp_path: Path) -> None:
+    """Test a profiled run explains every preprocess step and profiles every transform"""
+    profile_dir = tmp_path / "profile"
+    run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", check_counts=False, profile_dir=profile_dir
+    )
+
+    for stage in ("load", "parse_mpt_ids", "genotypes", "allele_to_genotype", "genotype_to_phenotype"):
+        assert "Total Time" in (profile_dir / f"preprocess.{stage}.explain.txt").read_text()
+        folded = (profile_dir / f"preprocess.{stage}.folded").read_text().splitlines()
+        assert all(FOLDED_LINE.match(line) and line.startswith(f"preprocess.{stage};statement ") for line in folded)
+    assert "COPY_TO_FILE" in (profile_dir / "preprocess.genotypes.folded").read_text()
+
+    for name in ("genotype", "genotype_to_phenotype", "allele_to_genotype"):
+        assert pstats.Stats(str(profile_dir / f"transform.{name}.prof")).total_calls > 0
+        folded = (profile_dir / f"transform.{name}.folded").read_text().splitlines()
+        assert folded
+        assert all(FOLDED_LINE.match(line) for line in folded)
@@ -0,0 +1,85 @@
+"""
+Test file for the template record factory.
+"""
+
+import pytest
+from biolink_model.datamodel.pydanticmodel_v2 import Genotype
+from koza import KozaTransform
+from koza.io.writer.passthrough_writer import PassthroughWriter
+
+from src.records import RecordFactory, validation_interval
+
+
+def template() -> Genotype:
+    return Genotype(
+        id="MMRRC:000000-UNC",
+        name="template",
+        in_taxon=["NCBITaxon:10090"],
+        in_taxon_label="Mus musculus",
+        provided_by=["infores:mmrrc"],
+    )
+
+
+@pytest.mark.parametrize(("validation", "interval"), [(None, 1), ("always", 1), ("off", 0), (1000, 1000), ("25", 25)])
+def test_validation_interval(validation: str | int | None, interval: int) -> None:
+    """Test each validation setting maps to how often records are validated"""
+    assert validation_interval(validation) == interval
+
+
+@pytest.mark.parametrize("validation", ["sometimes", 0, "-1"])
+def test_validation_interval_invalid(validation: str | int) -> None:
+    """Test unknown validation settings are rejected"""
+    with pytest.raises(ValueError, match="validation must be"):
+        validation_interval(validation)
+
+
+def test_build_matches_direct_construction() -> None:
+    """Test a built record equals the same record constructed directly, with the same fields set"""
+    built = RecordFactory(template(), "off").build(id="MMRRC:000001-UNC", name="C57BL/6", xref=None)
+    direct = Genotype(
+        id="MMRRC:000001-UNC",
+        name="C57BL/6",
+        xref=None,
+        in_taxon=["NCBITaxon:10090"],
+        in_taxon_label="Mus musculus",
+        provided_by=["infores:mmrrc"],
+    )
+
+    assert built == direct
+    assert built.model_fields_set == direct.model_fields_set
+
+
+@pytest.mark.parametrize("validation", ["always", "off"])
+def test_built_records_share_no_lists(validation: str) -> None:
+    """Test mutating a built record's list fields changes neither the template nor other records"""
+    records = RecordFactory(template(), validation)
+    first = records.build(id="MMRRC:000001-UNC")
+    second = records.build(id="MMRRC:000002-UNC")
+    first.in_taxon.append("NCBITaxon:9606")
+
+    assert second.in_taxon == ["NCBITaxon:10090"]
+    assert records.template.in_taxon == ["NCBITaxon:10090"]
+
+
+@pytest.mark.parametrize(("validation", "skipped"), [("always", 4), (2, 2), ("off", 0)])
+def test_failures_skipped_when_validated(validation: str | int, skipped: int) -> None:
+    """Test invalid records are skipped only when they are among those validated"""
+    records = RecordFactory(template(), validation)
+    built = [records.build(id=None) for _ in range(4)]
+
+    assert built.count(None) == skipped
+    assert records.failures == skipped
+
+
+def test_configure_and_report() -> None:
+    """Test the config's validation setting is applied and failures are logged with examples"""
+    records = RecordFactory(template())
+    koza_transform = KozaTransform(mappings={}, writer=PassthroughWriter(), extra_fields={"validation": "3"})
+    records.configure(koza_transform)
+    assert records.interval == 3
+
+    records.build(id=None)
+    records.build(id="MMRRC:000001-UNC")
+    records.report(koza_transform)
+    assert records.failures == 1
+    assert records.examples == ["{'id': None}: id Input should be a valid string"]
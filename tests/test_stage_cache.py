@@ -0,0 +1,94 @@
+"""
+Test file for the content-hash stage cache.
+"""
+
+from pathlib import Path
+
+from pipeline import run_pipeline
+from stage_cache import StageCache, hash_inputs
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_hash_inputs(tmp_path: Path) -> None:
+    """Test keys change with file contents and package versions, but not with file order"""
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    a.write_text("1")
+    b.write_text("2")
+
+    key = hash_inputs([a, b], ["duckdb"])
+    assert hash_inputs([b, a], ["duckdb"]) == key
+    assert hash_inputs([a, b]) != key
+    b.write_text("3")
+    assert hash_inputs([a, b], ["duckdb"]) != key
+
+
+def test_pipeline_reuses_unchanged_stages(tmp_path: Path) -> None:
+    """Test a second run restores every stage from the cache with identical outputs"""
+    cache = StageCache(tmp_path / "cache")
+    first = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "first", check_counts=False, stage_cache=cache
+    )
+    assert set(cache.report.values()) == {"ran"}
+
+    cache = StageCache(tmp_path / "cache")
+    second = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed2", tmp_path / "second", check_counts=False, stage_cache=cache
+    )
+    assert cache.report == {
+        "preprocess": "reused",
+        "transform.genotype": "reused",
+        "transform.genotype_to_phenotype": "reused",
+        "transform.allele_to_genotype": "reused",
+    }
+    assert second == first
+    for kgx_file in (tmp_path / "first").glob("*.tsv"):
+        assert (tmp_path / "second" / kgx_file.name).read_bytes() == kgx_file.read_bytes()
+
+
+def test_pipeline_reruns_changed_stages(tmp_path: Path) -> None:
+    """Test a changed catalog reruns preprocessing, and only transforms whose input changed"""
+    run_pipeline(
+        SAMPLE_CATALOG,
+        tmp_path / "processed",
+        tmp_path / "output",
+        stage_cache=StageCache(tmp_path / "c"),
+        check_counts=False,
+    )
+
+    # A strain without alleles or phenotypes only changes genotypes.csv
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text(SAMPLE_CATALOG.read_text() + "MMRRC:000006-MU,STOCK Pax6<Sey>/Mmmh,,SPN,CA,,,,,,,,,,,,,\n")
+    cache = StageCache(tmp_path / "c")
+    results = run_pipeline(catalog, tmp_path / "processed", tmp_path / "output", check_counts=False, stage_cache=cache)
+
+    assert cache.report == {
+        "preprocess": "ran",
+        "transform.genotype": "ran",
+        "transform.genotype_to_phenotype": "reused",
+        "transform.allele_to_genotype": "reused",
+    }
+    assert results["genotype"] == {"mmrrc_genotype_nodes.tsv": 6}
+
+
+def test_restore_removes_stale_shards(tmp_path: Path) -> None:
+    """Test restoring preprocessing drops shard directories the transforms would read instead of the CSVs"""
+    run_pipeline(
+        SAMPLE_CATALOG,
+        tmp_path / "processed",
+        tmp_path / "output",
+        check_counts=False,
+        stage_cache=StageCache(tmp_path / "c"),
+    )
+
+    stale_dir = tmp_path / "processed2" / "genotypes"
+    stale_dir.mkdir(parents=True)
+    (stale_dir / "part-0000.csv").write_text("strain_id\nMMRRC:999999-UNC\n")
+    cache = StageCache(tmp_path / "c")
+    results = run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed2", tmp_path / "output2", check_counts=False, stage_cache=cache
+    )
+
+    assert cache.report["preprocess"] == "reused"
+    assert not stale_dir.exists()
+    assert results["genotype"] == {"mmrrc_genotype_nodes.tsv": 5}
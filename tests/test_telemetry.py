@@ -0,0 +1,72 @@
+"""
+Test file for per-stage pipeline telemetry.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from pipeline import run_pipeline
+from telemetry import add_telemetry_to_metadata, read_records, record_stage
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_record_stage(tmp_path: Path) -> None:
+    """Test a stage appends one JSON line with its rows, timing, memory and output size"""
+    telemetry_file = tmp_path / "telemetry.jsonl"
+    output = tmp_path / "out.txt"
+    with record_stage("example", telemetry_file, [output]) as stats:
+        output.write_text("12345")
+        stats["rows"] = 10
+
+    (record,) = [json.loads(line) for line in telemetry_file.read_text().splitlines()]
+    assert record["stage"] == "example"
+    assert record["rows"] == 10
+    assert record["output_bytes"] == 5
+    assert record["wall_seconds"] >= 0
+    assert record["peak_rss_bytes"] is None or record["peak_rss_bytes"] > 0
+
+
+def test_failed_stage_not_recorded(tmp_path: Path) -> None:
+    """Test nothing is recorded for a stage that raises"""
+    telemetry_file = tmp_path / "telemetry.jsonl"
+    with pytest.raises(ValueError), record_stage("example", telemetry_file):
+        raise ValueError("boom")
+    assert read_records(telemetry_file) == []
+
+
+def test_pipeline_telemetry(tmp_path: Path) -> None:
+    """Test the pipeline records each preprocess query and transform, and metadata gets the latest of each"""
+    telemetry_file = tmp_path / "telemetry.jsonl"
+    run_pipeline(
+        SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", check_counts=False, telemetry_file=telemetry_file
+    )
+
+    records = {record["stage"]: record for record in read_records(telemetry_file)}
+    assert set(records) == {
+        "preprocess.load",
+        "preprocess.parse_mpt_ids",
+        "preprocess.genotypes",
+        "preprocess.allele_to_genotype",
+        "preprocess.genotype_to_phenotype",
+        "transform.genotype",
+        "transform.genotype_to_phenotype",
+        "transform.allele_to_genotype",
+    }
+    assert records["preprocess.load"]["rows"] == 7
+    assert records["transform.genotype"]["rows"] == 5
+    assert (
+        records["transform.genotype"]["output_bytes"]
+        == (tmp_path / "output" / "mmrrc_genotype_nodes.tsv").stat().st_size
+    )
+
+    metadata_file = tmp_path / "release-metadata.yaml"
+    metadata_file.write_text(yaml.safe_dump({"ingest_name": "mmrrc-ingest"}))
+    add_telemetry_to_metadata(metadata_file, telemetry_file)
+    metadata = yaml.safe_load(metadata_file.read_text())
+    assert metadata["ingest_name"] == "mmrrc-ingest"
+    assert [stage["stage"] for stage in metadata["telemetry"]][:2] == ["preprocess.load", "preprocess.parse_mpt_ids"]
+    assert len(metadata["telemetry"]) == len(records)
@@ -0,0 +1,48 @@
+"""
+Test file for running the koza transforms over a preprocess delta.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from preprocess import preprocess_mmrrc
+from transform_delta import transform_delta
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def test_transform_delta_outputs(tmp_path: Path) -> None:
+    """Test an initial delta transforms every row into the added KGX files"""
+    processed_dir = tmp_path / "processed"
+    preprocess_mmrrc(SAMPLE_CATALOG, processed_dir, snapshot_dir=tmp_path / "snapshot")
+
+    counts = transform_delta(processed_dir / "delta", tmp_path / "output")
+
+    assert counts["added/mmrrc_genotype_nodes.tsv"] == 5
+    assert counts["added/mmrrc_allele_to_genotype_edges.tsv"] == 5
+    # The phenotype with an empty label is skipped by the transform
+    assert counts["added/mmrrc_genotype_to_phenotype_edges.tsv"] == 5
+    assert counts["removed/mmrrc_genotype_nodes.tsv"] == 0
+
+
+def test_snapshot_committed_after_transforms(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the staged snapshot replaces the previous one only once the delta transforms succeed"""
+    import transform_delta as module
+
+    processed_dir = tmp_path / "processed"
+    snapshot_dir = tmp_path / "snapshot"
+    preprocess_mmrrc(SAMPLE_CATALOG, processed_dir, snapshot_dir=snapshot_dir)
+
+    def fail(*args, **kwargs) -> None:
+        raise RuntimeError("transform failed")
+
+    monkeypatch.setattr(module, "run_transform", fail)
+    with pytest.raises(RuntimeError):
+        transform_delta(processed_dir / "delta", tmp_path / "output", snapshot_dir=snapshot_dir)
+    assert not (snapshot_dir / "genotypes.parquet").exists()
+
+    monkeypatch.undo()
+    transform_delta(processed_dir / "delta", tmp_path / "output", snapshot_dir=snapshot_dir)
+    assert (snapshot_dir / "genotypes.parquet").exists()
+    assert not (snapshot_dir / "staged").exists()
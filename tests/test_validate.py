@@ -0,0 +1,54 @@
+"""
+Test file for the set-based KGX validation stage.
+"""
+
+from pathlib import Path
+
+from pipeline import run_pipeline
+from validate import validate_kgx
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "mmrrc_catalog_sample.csv"
+
+
+def failures(report: dict) -> dict[tuple[str, str], list[str]]:
+    return {(check["file"], check["check"]): check["examples"] for check in report["checks"] if check["failures"]}
+
+
+def test_sample_output_valid(tmp_path: Path) -> None:
+    """Test the transform output for the sample catalog passes every check"""
+    run_pipeline(SAMPLE_CATALOG, tmp_path / "processed", tmp_path / "output", check_counts=False)
+
+    report = validate_kgx(tmp_path / "output")
+
+    assert report["passed"], failures(report)
+    assert report["fan_out"]["mmrrc_allele_to_genotype_edges.tsv"]["max"] == 2
+    assert report["fan_out"]["mmrrc_genotype_to_phenotype_edges.tsv"]["edges"] == 5
+
+
+def test_invalid_output(tmp_path: Path) -> None:
+    """Test dangling subjects, malformed CURIEs, duplicates and fan-out are reported"""
+    (tmp_path / "mmrrc_genotype_nodes.tsv").write_text(
+        "id\tcategory\nMMRRC:000001-UNC\tbiolink:Genotype\nMMRRC:000002-UNC\tbiolink:Genotype\n"
+        "MMRRC 3\tbiolink:Genotype\n"
+    )
+    (tmp_path / "mmrrc_genotype_to_phenotype_edges.tsv").write_text(
+        "id\tsubject\tpredicate\tobject\n"
+        "uuid:1\tMMRRC:000001-UNC\tbiolink:has_phenotype\tMP:0000063\n"
+        "uuid:1\tMMRRC:000001-UNC\tbiolink:has_phenotype\tMP:0000063\n"
+        "uuid:2\tMMRRC:000001-UNC\tbiolink:has_phenotype\tMP:63\n"
+        "uuid:3\tMMRRC:000009-UNC\tbiolink:has_phenotype\tMP:0000137\n"
+    )
+
+    report = validate_kgx(tmp_path, max_fan_out=2)
+
+    edges = "mmrrc_genotype_to_phenotype_edges.tsv"
+    assert not report["passed"]
+    assert failures(report) == {
+        ("mmrrc_genotype_nodes.tsv", "invalid_node_id"): ["MMRRC 3"],
+        (edges, "dangling_subject"): ["MMRRC:000009-UNC"],
+        (edges, "invalid_object_curie"): ["MP:63"],
+        (edges, "duplicate_edge_id"): ["uuid:1"],
+        (edges, "duplicate_edge"): ["MMRRC:000001-UNC biolink:has_phenotype MP:0000063"],
+        (edges, "fan_out_above_limit"): ["MMRRC:000001-UNC (3 edges)"],
+    }
+    assert report["fan_out"][edges] == {"subjects": 2, "edges": 4, "max": 3, "mean": 2.0, "median": 1, "p99": 3}